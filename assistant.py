@@ -0,0 +1,160 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+# Upper bound for the dataset summary sent with every request
+SUMMARY_TOKEN_BUDGET = 1200
+# Rough size of a token for English/Spanish text and numbers
+CHARS_PER_TOKEN = 4
+MAX_NAME_CHARS = 40
+# Finished responses kept for reuse (per server process)
+MAX_CACHED_RESPONSES = 32
+
+SYSTEM_PROMPT = "You are a helpful Data Analysis Assistant capable of finding hidden insights in CSV data."
+ANALYSIS_PROMPT = """Act as an expert Data Scientist. Analyze the following dataset summary and provide:
+1. 3 Key Observations/Trends.
+2. Potential anomalies or data quality issues.
+3. Suggestions for 2 specific advanced visualizations.
+
+Dataset:
+{summary}
+
+Format the output in clear Markdown with emojis. Keep it concise but professional."""
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _name(col):
+    col = str(col)
+    return col if len(col) <= MAX_NAME_CHARS else col[:MAX_NAME_CHARS - 1] + "…"
+
+
+def _num(value):
+    return "nan" if value is None or (isinstance(value, float) and np.isnan(value)) else f"{value:.4g}"
+
+
+def _column_lines(profile):
+    overview = profile["overview"]
+    for col, row in profile["numeric"].iterrows():
+        yield (f"- {_name(col)} (num): mean {_num(row['mean'])}, std {_num(row['std'])}, "
+               f"min {_num(row['min'])}, max {_num(row['max'])}, nulls {overview.loc[col, 'nulls']}")
+    for col, row in profile["categorical"].iterrows():
+        top = _name(row["top"]) if row["top"] is not None else "-"
+        flag = ", identifier-like" if col in profile.get("high_cardinality", []) else ""
+        yield (f"- {_name(col)} (cat): {row['unique']} distinct, top '{top}' ({row['freq']}), "
+               f"nulls {overview.loc[col, 'nulls']}{flag}")
+    described = set(profile["numeric"].index) | set(profile["categorical"].index)
+    for col, row in overview.iterrows():
+        if col not in described:
+            yield f"- {_name(col)} ({row['dtype']}): {row['distinct']} distinct, nulls {row['nulls']}"
+
+
+def build_summary(profile, token_budget=SUMMARY_TOKEN_BUDGET):
+    """Compact text description of a dataset profile.
+
+    One short line per column, taken until ``token_budget`` is spent, so the
+    prompt size is bounded no matter how many columns the dataset has.
+    """
+    lines = [
+        f"Rows: {profile['rows']}, Columns: {profile['columns']} "
+        f"({len(profile['numeric_columns'])} numeric, {len(profile['categorical_columns'])} categorical), "
+        f"missing cells: {profile['null_cells']}",
+        "Columns:",
+    ]
+    used = sum(estimate_tokens(line) for line in lines)
+    # Leave room for the line that reports omitted columns
+    budget = token_budget - estimate_tokens("... and 100000 more columns omitted")
+    shown = 0
+    for line in _column_lines(profile):
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+    if shown < profile["columns"]:
+        lines.append(f"... and {profile['columns'] - shown} more columns omitted")
+    return "\n".join(lines)
+
+
+def request_key(*parts):
+    """Stable hash of everything that determines a response."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnalysisJob:
+    """One chat completion streamed on a background thread.
+
+    ``text`` grows as tokens arrive, so the UI can poll it without waiting
+    for the whole response.
+    """
+
+    def __init__(self, client, model, messages, **params):
+        self.client = client
+        self.model = model
+        self.messages = messages
+        self.params = params
+        self.text = ""
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model, messages=self.messages, stream=True, **self.params
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    self.text += chunk.choices[0].delta.content
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+
+class ResponseCache:
+    """Running and finished analysis jobs by request key (LRU).
+
+    A finished job is the cached response: asking again for the same key
+    returns it instead of calling the API. Failed jobs are dropped so they
+    can be retried.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key, make_job):
+        """Return the job for ``key``, starting ``make_job()`` only if needed."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (job.done and job.error):
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = make_job().start()
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+            return job
@@ -0,0 +1,112 @@
+"""Profile every CSV of a directory in parallel and write JSON/HTML reports.
+
+    python batch_profile.py exports/ --out reports --workers 8
+
+Each file is analyzed by ``engine.analyze_csv`` (the same code the dashboard
+uses) in a separate process. Reports are named ``<name>-<content hash>``, so
+same-named files from different directories never overwrite each other.
+``<out>/index.json`` maps each content hash to its report, so the dashboard
+reuses a report when the same file is uploaded with the same settings.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import REPORT_INDEX, REPORTS_DIR, analyze_csv, index_key, read_report_index, report_to_html, report_to_json
+
+
+def report_stem(path, data_key, optimize_types):
+    """Output name: readable file stem plus the content hash (and type setting)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{data_key}" + ("" if optimize_types else "-raw")
+
+
+def process_file(path, out_dir, separator, encoding, optimize_types, formats):
+    """Analyze one CSV and write its reports; returns a small status dict."""
+    start = time.perf_counter()
+    report = analyze_csv(path, separator, encoding, optimize_types)
+    stem = report_stem(path, report["data_key"], optimize_types)
+    written = []
+    if "json" in formats:
+        with open(os.path.join(out_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+            f.write(report_to_json(report))
+        written.append(f"{stem}.json")
+    if "html" in formats:
+        with open(os.path.join(out_dir, f"{stem}.html"), "w", encoding="utf-8") as f:
+            f.write(report_to_html(report))
+        written.append(f"{stem}.html")
+    return {
+        "source": path,
+        "key": index_key(report["data_key"], optimize_types),
+        "json": f"{stem}.json" if "json" in formats else None,
+        "files": written,
+        "rows": report["profile"]["rows"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_index(out_dir, results):
+    # Merge with earlier runs so reports of other directories stay reachable
+    index = read_report_index(out_dir)
+    index.update({r["key"]: r["json"] for r in results if r["json"]})
+    tmp_path = os.path.join(out_dir, f"{REPORT_INDEX}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, os.path.join(out_dir, REPORT_INDEX))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfila en paralelo todos los CSV de un directorio.")
+    parser.add_argument("input", help="Directorio con archivos CSV (o un único CSV)")
+    parser.add_argument("--out", default=REPORTS_DIR, help=f"Directorio de salida (por defecto: {REPORTS_DIR})")
+    parser.add_argument("--sep", default=",", help="Separador de columnas")
+    parser.add_argument("--encoding", default="utf-8", help="Codificación de los archivos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos en paralelo (por defecto: todos los núcleos)")
+    parser.add_argument("--format", nargs="+", choices=["json", "html"], default=["json", "html"], dest="formats")
+    parser.add_argument("--no-optimize-types", action="store_false", dest="optimize_types",
+                        help="No compactar tipos (debe coincidir con la opción del dashboard)")
+    parser.add_argument("--recursive", action="store_true", help="Buscar CSV también en subdirectorios")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.input):
+        pattern = os.path.join(args.input, "**", "*.csv") if args.recursive else os.path.join(args.input, "*.csv")
+        paths = sorted(glob.glob(pattern, recursive=args.recursive))
+    else:
+        paths = [args.input]
+    if not paths:
+        print(f"No se encontraron archivos CSV en {args.input}", file=sys.stderr)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    results, failures = [], []
+    # Largest files first so a big file does not start last and hold up the pool
+    paths.sort(key=os.path.getsize, reverse=True)
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(process_file, path, args.out, args.sep, args.encoding, args.optimize_types, args.formats): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append(path)
+                print(f"✗ {path}: {e}", file=sys.stderr)
+                continue
+            results.append(result)
+            print(f"✓ {path} ({result['rows']:,} filas, {result['seconds']:.2f}s) -> {', '.join(result['files'])}")
+
+    write_index(args.out, results)
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)}/{len(paths)} archivos en {elapsed:.2f}s con {args.workers} procesos -> {args.out}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
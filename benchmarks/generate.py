@@ -0,0 +1,140 @@
+"""Synthetic CSVs with the schema of the bundled datasets, at any size.
+
+    python benchmarks/generate.py agro 1M --out benchmarks/data/agro_1M.csv
+    python benchmarks/generate.py monitoreo 100k --cardinality 5000 --null-rate 0.05
+
+Every column is modelled from the bundled file: identifiers keep their
+prefix, categories their frequencies, numbers their mean/std/range and
+decimals, booleans their share of True and dates/times their range and
+format. Rows are written in blocks, so 10M rows never sit in memory.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from timeseries import infer_datetime_format  # noqa: E402
+
+SCHEMAS = {
+    "agro": os.path.join(ROOT, "agro_colombia.csv"),
+    "energia": os.path.join(ROOT, "energia_renovable(in).csv"),
+    "monitoreo": os.path.join(ROOT, "monitoreo_ambiental.csv"),
+}
+SIZES = {"100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+BLOCK_ROWS = 500_000
+
+
+def parse_size(text):
+    if text in SIZES:
+        return SIZES[text]
+    return int(text.replace("_", ""))
+
+
+def _decimals(values):
+    text = values.dropna().astype(str)
+    return int(text.str.split(".").str[1].str.len().max()) if text.str.contains(".", regex=False).any() else 0
+
+
+def column_models(seed_df):
+    """Describe how to synthesize each column of ``seed_df``."""
+    models = {}
+    for col in seed_df.columns:
+        values = seed_df[col].dropna()
+        if pd.api.types.is_bool_dtype(values):
+            models[col] = {"kind": "bool", "p": float(values.mean())}
+        elif pd.api.types.is_numeric_dtype(values):
+            models[col] = {
+                "kind": "int" if pd.api.types.is_integer_dtype(values) else "float",
+                "mean": float(values.mean()), "std": float(values.std() or 1.0),
+                "min": float(values.min()), "max": float(values.max()),
+                "decimals": _decimals(values),
+            }
+        elif values.nunique() == len(values):
+            # Identifier: PREFIX_0001 -> prefix "PREFIX_"
+            prefix = values.iloc[0].rstrip("0123456789")
+            models[col] = {"kind": "id", "prefix": prefix}
+        elif (fmt := infer_datetime_format(values)) is not None:
+            parsed = pd.to_datetime(values, format=fmt, errors="coerce").dropna()
+            models[col] = {"kind": "datetime", "format": fmt,
+                           "min": parsed.min().value, "max": parsed.max().value}
+        else:
+            freqs = values.value_counts(normalize=True)
+            models[col] = {"kind": "category", "values": freqs.index.tolist(), "p": freqs.to_numpy()}
+    return models
+
+
+def _category_pool(model, cardinality):
+    """Observed categories, extended with numbered variants up to ``cardinality``."""
+    values, p = list(model["values"]), np.asarray(model["p"], dtype=float)
+    if cardinality and cardinality > len(values):
+        extra = [f"{values[i % len(values)]} {i // len(values) + 1}" for i in range(cardinality - len(values))]
+        # Extra categories share a fixed 30% of the mass, so the originals stay the most frequent
+        p = np.concatenate([p * 0.7, np.full(len(extra), 0.3 / len(extra))])
+        values = values + extra
+    return np.array(values, dtype=object), p / p.sum()
+
+
+def synthesize_block(models, start, rows, rng, cardinality=None, null_rate=0.0):
+    """Rows ``start``..``start + rows`` of the synthetic dataset."""
+    columns = {}
+    for col, model in models.items():
+        kind = model["kind"]
+        if kind == "id":
+            width = max(4, len(str(start + rows)))
+            ids = pd.Series(np.arange(start, start + rows)).astype(str).str.zfill(width)
+            columns[col] = model["prefix"] + ids
+            continue
+        if kind == "bool":
+            values = pd.Series(rng.random(rows) < model["p"])
+        elif kind in ("int", "float"):
+            raw = np.clip(rng.normal(model["mean"], model["std"], rows), model["min"], model["max"])
+            values = pd.Series(np.round(raw, model["decimals"]))
+            if kind == "int":
+                values = values.astype("int64")
+        elif kind == "datetime":
+            stamps = pd.to_datetime(rng.integers(model["min"], model["max"] + 1, rows))
+            values = pd.Series(stamps.strftime(model["format"]))
+        else:
+            pool, p = _category_pool(model, cardinality)
+            values = pd.Series(pool[rng.choice(len(pool), rows, p=p)])
+        if null_rate:
+            values = values.astype(object).mask(rng.random(rows) < null_rate)
+        columns[col] = values
+    return pd.DataFrame(columns)
+
+
+def generate_csv(schema, rows, out_path, cardinality=None, null_rate=0.0, seed=0, block_rows=BLOCK_ROWS):
+    """Write ``rows`` synthetic rows shaped like ``schema`` to ``out_path``."""
+    models = column_models(pd.read_csv(SCHEMAS[schema]))
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    for start in range(0, rows, block_rows):
+        block = synthesize_block(models, start, min(block_rows, rows - start), rng, cardinality, null_rate)
+        block.to_csv(tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera CSV sintéticos con el esquema de los datasets incluidos.")
+    parser.add_argument("schema", choices=sorted(SCHEMAS))
+    parser.add_argument("rows", help="Filas: 100k, 1M, 10M o un número")
+    parser.add_argument("--out", help="Archivo de salida (por defecto benchmarks/data/<schema>_<rows>.csv)")
+    parser.add_argument("--cardinality", type=int, help="Valores distintos por columna categórica")
+    parser.add_argument("--null-rate", type=float, default=0.0, help="Proporción de celdas vacías (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.join(ROOT, "benchmarks", "data", f"{args.schema}_{args.rows}.csv")
+    generate_csv(args.schema, parse_size(args.rows), out, args.cardinality, args.null_rate, args.seed)
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
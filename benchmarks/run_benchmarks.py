@@ -0,0 +1,259 @@
+"""Time and memory-profile every dashboard stage on synthetic data.
+
+    python benchmarks/run_benchmarks.py --sizes 100k 1M
+    python benchmarks/run_benchmarks.py --sizes 100k --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --sizes 100k 1M --save-baseline
+
+Datasets are generated once into benchmarks/data/ (see generate.py). Each
+stage calls the same functions the dashboard uses. The reported time is the
+best of ``--repeat`` runs; peak memory comes from one extra run under
+tracemalloc (NumPy and pandas buffers included). ``--compare`` exits with
+status 1 when a stage is slower or larger than the baseline beyond the
+tolerance.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from charts import MAX_PLOT_POINTS, bin_scatter, numeric_summary, reduce_series  # noqa: E402
+from compaction import compact_frame  # noqa: E402
+from correlation import correlation_matrix  # noqa: E402
+from fingerprints import FingerprintIndex  # noqa: E402
+from generate import SCHEMAS, SIZES, generate_csv, parse_size  # noqa: E402
+from profiling import categorical_columns, numeric_columns, numeric_stats, profile_frame  # noqa: E402
+from timeseries import prepare_time_index  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+# Relative slowdown (and memory growth) tolerated before flagging a regression
+TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_DELTA_SECONDS = 0.05
+MIN_DELTA_MB = 5.0
+
+
+# --- Stages (each reads/writes the shared ``ctx``) ---
+def stage_read(ctx):
+    ctx["raw"] = pd.read_csv(ctx["path"])
+
+
+def stage_compact(ctx):
+    ctx["df"], _ = compact_frame(ctx["raw"])
+    ctx["num_cols"] = numeric_columns(ctx["df"])
+
+
+def stage_duplicates(ctx):
+    FingerprintIndex().duplicate_count(ctx["df"])
+
+
+def stage_nulls(ctx):
+    ctx["df"].isna().sum()
+
+
+def stage_value_counts(ctx):
+    for col in categorical_columns(ctx["df"]):
+        ctx["df"][col].value_counts()
+
+
+def stage_describe(ctx):
+    numeric_stats(ctx["df"][ctx["num_cols"]])
+
+
+def stage_profile(ctx):
+    ctx["profile"] = profile_frame(ctx["df"])
+
+
+def stage_corr(ctx):
+    ctx["corr"] = correlation_matrix(ctx["df"], ctx["num_cols"])
+
+
+def stage_datetime(ctx):
+    # Parse the raw text column and build the rollup pyramid, as the time tab does
+    ctx["time_index"] = None
+    for col in categorical_columns(ctx["raw"]):
+        time_index = prepare_time_index(ctx["raw"], col, ctx["num_cols"])
+        if time_index is not None:
+            ctx["time_index"] = time_index
+            break
+
+
+def stage_figures(ctx):
+    """Build the default figure of every tab and serialize it to JSON."""
+    df, profile, num_cols = ctx["df"], ctx["profile"], ctx["num_cols"]
+    figures = []
+    cat_cols = profile["categorical_columns"]
+    if cat_cols:
+        counts = profile["top_values"][cat_cols[0]].reset_index()
+        counts.columns = ["Valor", "Frecuencia"]
+        figures.append(px.bar(counts, x="Valor", y="Frecuencia"))
+    if num_cols:
+        summary = numeric_summary(df[num_cols[0]])
+        figures.append(go.Figure(go.Bar(x=summary["edges"][:-1], y=summary["counts"])))
+    if len(num_cols) >= 2:
+        figures.append(px.imshow(ctx["corr"], text_auto=".2f"))
+        x, y = num_cols[0], num_cols[1]
+        if len(df) > MAX_PLOT_POINTS:
+            figures.append(px.scatter(bin_scatter(df, x, y, bins=int(np.sqrt(MAX_PLOT_POINTS))), x=x, y=y,
+                                      size="Conteo", render_mode="webgl"))
+        else:
+            figures.append(px.scatter(df, x=x, y=y))
+    time_index = ctx.get("time_index")
+    if time_index is not None and num_cols:
+        frame = time_index["frame"]
+        series, _ = reduce_series(frame, frame.columns[0], num_cols[0], MAX_PLOT_POINTS)
+        figures.append(px.line(series, x=frame.columns[0], y=num_cols[0]))
+    ctx["json_kb"] = sum(len(fig.to_json()) for fig in figures) / 1024
+
+
+STAGES = [
+    ("read", stage_read),
+    ("compact", stage_compact),
+    ("duplicates", stage_duplicates),
+    ("nulls", stage_nulls),
+    ("value_counts", stage_value_counts),
+    ("describe", stage_describe),
+    ("profile", stage_profile),
+    ("corr", stage_corr),
+    ("datetime", stage_datetime),
+    ("figures", stage_figures),
+]
+
+
+def run_pipeline(path, traced=False):
+    """Run every stage once; returns ``{stage: seconds or peak MB}``."""
+    ctx = {"path": path}
+    measures = {}
+    for name, stage in STAGES:
+        if traced:
+            tracemalloc.start()
+            stage(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            measures[name] = peak / 2 ** 20
+        else:
+            start = time.perf_counter()
+            stage(ctx)
+            measures[name] = time.perf_counter() - start
+    return measures, ctx
+
+
+def benchmark_file(path, repeat=3, memory=True):
+    timings = [run_pipeline(path)[0] for _ in range(repeat)]
+    results = {name: {"seconds": round(min(t[name] for t in timings), 4)} for name, _ in STAGES}
+    ctx = run_pipeline(path)[1] if not memory else None
+    if memory:
+        peaks, ctx = run_pipeline(path, traced=True)
+        for name, peak in peaks.items():
+            results[name]["peak_mb"] = round(peak, 2)
+    results["figures"]["json_kb"] = round(ctx["json_kb"], 1)
+    results["rows"] = len(ctx["df"])
+    return results
+
+
+def dataset_path(schema, size, cardinality, null_rate):
+    suffix = f"_c{cardinality}" if cardinality else ""
+    suffix += f"_n{null_rate}" if null_rate else ""
+    path = os.path.join(DATA_DIR, f"{schema}_{size}{suffix}.csv")
+    if not os.path.exists(path):
+        print(f"Generando {os.path.relpath(path, ROOT)}...", file=sys.stderr)
+        generate_csv(schema, parse_size(size), path, cardinality, null_rate)
+    return path
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": datetime.date.today().isoformat(),
+    }
+
+
+def results_table(results):
+    rows = []
+    for dataset, stages in results.items():
+        for name, _ in STAGES:
+            rows.append({"dataset": dataset, "stage": name, **stages[name]})
+    return pd.DataFrame(rows)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Stages that got slower or use more memory than ``baseline``."""
+    regressions = []
+    for dataset, stages in results.items():
+        base_stages = baseline.get(dataset)
+        if base_stages is None:
+            continue
+        for name, _ in STAGES:
+            new, old = stages[name], base_stages.get(name, {})
+            for metric, min_delta in (("seconds", MIN_DELTA_SECONDS), ("peak_mb", MIN_DELTA_MB), ("json_kb", 0.0)):
+                if metric not in new or metric not in old:
+                    continue
+                if new[metric] > old[metric] * (1 + tolerance) and new[metric] - old[metric] > min_delta:
+                    regressions.append({"dataset": dataset, "stage": name, "metric": metric,
+                                        "baseline": old[metric], "actual": new[metric],
+                                        "ratio": round(new[metric] / old[metric], 2) if old[metric] else None})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de cada etapa del dashboard con datos sintéticos.")
+    parser.add_argument("--schemas", nargs="+", choices=sorted(SCHEMAS), default=sorted(SCHEMAS))
+    parser.add_argument("--sizes", nargs="+", default=["100k"], help=f"Tamaños: {', '.join(SIZES)} o un número de filas")
+    parser.add_argument("--cardinality", type=int, help="Valores distintos por columna categórica")
+    parser.add_argument("--null-rate", type=float, default=0.0, help="Proporción de celdas vacías (0-1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones cronometradas (se reporta la mejor)")
+    parser.add_argument("--no-memory", action="store_false", dest="memory", help="Omitir la medición de memoria")
+    parser.add_argument("--output", help="Guardar los resultados en este JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="Comparar con un baseline y fallar si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help=f"Escribir los resultados en {os.path.relpath(BASELINE_PATH, ROOT)}")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        for schema in args.schemas:
+            dataset = f"{schema}/{size}"
+            if args.cardinality:
+                dataset += f"/c{args.cardinality}"
+            if args.null_rate:
+                dataset += f"/n{args.null_rate}"
+            path = dataset_path(schema, size, args.cardinality, args.null_rate)
+            print(f"Midiendo {dataset}...", file=sys.stderr)
+            results[dataset] = benchmark_file(path, args.repeat, args.memory)
+
+    print(results_table(results).to_string(index=False))
+    payload = {"environment": environment(), "results": results}
+    for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print("\nRegresiones frente al baseline:")
+            print(pd.DataFrame(regressions).to_string(index=False))
+            return 1
+        print("\nSin regresiones frente al baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
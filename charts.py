@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# Default max points sent to the browser per figure
+MAX_PLOT_POINTS = 10_000
+# Grid used when a scatter plot is aggregated into 2D density bins
+SCATTER_BINS = 120
+
+
+def _as_float(values):
+    """Numeric view of a column for bucketing (datetimes become int64 ns)."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: positions of the points to keep.
+
+    ``x`` must be sorted. The first and last points are always kept and each
+    bucket in between contributes the point forming the largest triangle with
+    the previous pick and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picks = np.empty(n_out, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        picks[i + 1] = prev
+    return picks
+
+
+def minmax_indices(y, n_out):
+    """Keep the min and the max of each of ``n_out // 2`` equal-size buckets."""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_min = y == mins[bucket]
+    is_max = y == maxs[bucket]
+    # First occurrence of the min and of the max inside each bucket
+    keep = np.zeros(n, dtype=bool)
+    for mask in (is_min, is_max):
+        positions = np.flatnonzero(mask)
+        _, first = np.unique(bucket[positions], return_index=True)
+        keep[positions[first]] = True
+    return np.flatnonzero(keep)
+
+
+def reduce_series(df, x_col, y_col, budget=MAX_PLOT_POINTS, method="lttb"):
+    """Decimate a sorted time series to at most ``budget`` points.
+
+    Returns ``(reduced_df, dropped)`` where ``dropped`` is the number of
+    points that were not kept.
+    """
+    data = df[[x_col, y_col]].dropna()
+    if len(data) <= budget:
+        return data, 0
+    x = _as_float(data[x_col])
+    y = _as_float(data[y_col])
+    picks = lttb_indices(x, y, budget) if method == "lttb" else minmax_indices(y, budget)
+    return data.iloc[picks], len(data) - len(picks)
+
+
+def bin_scatter(df, x_col, y_col, color_col=None, bins=SCATTER_BINS):
+    """Aggregate a scatter into 2D density bins (per group when coloured).
+
+    Returns one row per non-empty bin with the bin centre, the number of
+    points it holds (``Conteo``) and, if given, the group. ``bins`` sizes the
+    whole chart: with groups the grid shrinks so ``bins²`` cells are shared.
+    """
+    # The same column on both axes: every point lies on the diagonal, bin it once
+    same_axis = x_col == y_col
+    cols = list(dict.fromkeys([x_col, y_col] + ([color_col] if color_col else [])))
+    data = df[cols].dropna(subset=[x_col, y_col])
+    if color_col:
+        # Each group gets its own grid, so at most bins² cells overall
+        bins = max(1, int(bins / np.sqrt(max(data[color_col].nunique(dropna=False), 1))))
+    x = _as_float(data[x_col])
+    y = x if same_axis else _as_float(data[y_col])
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        data, x, y = data[finite], x[finite], y[finite]
+    x_edges = np.histogram_bin_edges(x, bins=bins)
+    x_bin = np.clip(np.searchsorted(x_edges, x, side="right") - 1, 0, bins - 1)
+    keys = {"_xb": x_bin}
+    if not same_axis:
+        y_edges = np.histogram_bin_edges(y, bins=bins)
+        keys["_yb"] = np.clip(np.searchsorted(y_edges, y, side="right") - 1, 0, bins - 1)
+    if color_col:
+        keys[color_col] = data[color_col].to_numpy()
+    binned = pd.DataFrame(keys).value_counts(dropna=False).rename("Conteo").reset_index()
+
+    binned[x_col] = ((x_edges[:-1] + x_edges[1:]) / 2)[binned["_xb"]]
+    if not same_axis:
+        binned[y_col] = ((y_edges[:-1] + y_edges[1:]) / 2)[binned["_yb"]]
+    return binned.drop(columns=[key for key in ("_xb", "_yb") if key in binned])
+
+
+# Bins of the numeric histogram
+HISTOGRAM_BINS = 30
+# Outliers drawn individually on the box plot (the most extreme ones)
+MAX_BOX_OUTLIERS = 200
+
+
+def numeric_summary(values, nbins=HISTOGRAM_BINS, max_outliers=MAX_BOX_OUTLIERS):
+    """Histogram bin counts and box-plot statistics of one numeric column.
+
+    The result has a fixed size regardless of the number of rows, so the
+    figures built from it serialize the same payload for 1k or 10M values.
+    """
+    data = _as_float(values)
+    # inf/-inf would break the histogram edges; they are counted apart
+    finite = np.isfinite(data)
+    n_nonfinite = int((~finite & ~np.isnan(data)).sum())
+    data = data[finite]
+    if data.size == 0:
+        return None
+
+    counts, edges = np.histogram(data, bins=nbins)
+    q1, median, q3 = np.quantile(data, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = data[(data >= low_fence) & (data <= high_fence)]
+    outliers = data[(data < low_fence) | (data > high_fence)]
+    if outliers.size > max_outliers:
+        # Keep the points furthest from the median
+        outliers = outliers[np.argsort(np.abs(outliers - median))[-max_outliers:]]
+
+    return {
+        "counts": counts,
+        "edges": edges,
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "mean": data.mean(),
+        "lower_whisker": inside.min() if inside.size else q1,
+        "upper_whisker": inside.max() if inside.size else q3,
+        "outliers": np.sort(outliers),
+        "n_outliers": int(((data < low_fence) | (data > high_fence)).sum()),
+        "n_nonfinite": n_nonfinite,
+    }
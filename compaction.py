@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from timeseries import TIME_ONLY_FORMATS, infer_datetime_format
+
+# Values inspected per column to decide its type
+INFERENCE_SAMPLE_SIZE = 1000
+# Text columns with at most this share of distinct values become categorical
+MAX_CATEGORY_RATIO = 0.5
+# Text spellings accepted as booleans (lower-cased)
+BOOLEAN_VALUES = {
+    "true": True, "false": False,
+    "verdadero": True, "falso": False,
+    "sí": True, "si": True, "no": False,
+    "yes": True,
+}
+
+
+def _memory(series):
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def infer_target_type(series, sample_size=INFERENCE_SAMPLE_SIZE):
+    """Decide from a sample what ``series`` should be stored as.
+
+    Returns one of ``"bool"``, ``"datetime"``, ``"category"``, ``"integer"``,
+    ``"float"`` or None when the current dtype is already the best fit.
+    """
+    values = series.dropna()
+    if values.empty or isinstance(series.dtype, pd.CategoricalDtype):
+        return None
+    sample = values.sample(min(sample_size, len(values)), random_state=0)
+
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    if not _is_text(series):
+        return None
+
+    text = sample.astype(str).str.strip().str.lower()
+    if text.isin(list(BOOLEAN_VALUES)).all():
+        return "bool"
+    fmt = infer_datetime_format(sample)
+    if fmt is not None and fmt not in TIME_ONLY_FORMATS:
+        return "datetime"
+    if values.nunique() <= MAX_CATEGORY_RATIO * len(values):
+        return "category"
+    return None
+
+
+def convert_column(series, target):
+    """Apply ``target``; returns None if the full column does not fit it."""
+    if target == "bool":
+        mapped = series.astype(str).str.strip().str.lower().map(BOOLEAN_VALUES)
+        if mapped[series.notna()].isna().any():
+            return None
+        # Nullable boolean keeps missing values missing
+        return mapped.astype("boolean") if series.isna().any() else mapped.astype(bool)
+    if target == "datetime":
+        fmt = infer_datetime_format(series)
+        if fmt is None:
+            return None
+        parsed = pd.to_datetime(series, format=fmt, errors="coerce")
+        if parsed.isna().sum() > series.isna().sum():
+            return None
+        return parsed
+    if target == "category":
+        return series.astype("category")
+    if target == "integer":
+        kind = "unsigned" if (series.dropna() >= 0).all() else "integer"
+        return pd.to_numeric(series, downcast=kind)
+    if target == "float":
+        smaller = series.astype("float32")
+        # Only downcast when no value changes (e.g. whole numbers, .5 steps)
+        if np.array_equal(smaller.astype("float64").to_numpy(), series.to_numpy(), equal_nan=True):
+            return smaller
+        return None
+    return None
+
+
+def compact_frame(df, sample_size=INFERENCE_SAMPLE_SIZE):
+    """Infer and apply compact dtypes to every column of ``df``.
+
+    Returns ``(compact_df, report)``; the report lists, per column, the
+    original and new dtype and the memory used before and after.
+    """
+    columns = {}
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        target = infer_target_type(series, sample_size)
+        converted = convert_column(series, target) if target else None
+        if converted is None or converted.dtype == series.dtype:
+            converted = series
+        before, after = _memory(series), _memory(converted)
+        if after > before:
+            converted, after = series, before
+        columns[col] = converted
+        rows.append({
+            "Columna": col,
+            "Tipo original": str(series.dtype),
+            "Tipo nuevo": str(converted.dtype),
+            "Memoria antes (KB)": before / 1024,
+            "Memoria después (KB)": after / 1024,
+        })
+
+    report = pd.DataFrame(rows)
+    saved = 1 - report["Memoria después (KB)"] / report["Memoria antes (KB)"].replace(0, np.nan)
+    report["Ahorro %"] = (saved.fillna(0) * 100).round(1)
+    return pd.DataFrame(columns, index=df.index), report
@@ -0,0 +1,155 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Columns per block when the co-moment matrices are split for parallel work
+BLOCK_SIZE = 64
+# Heatmaps larger than this are shown without per-cell text
+MAX_ANNOTATED_COLUMNS = 20
+
+
+class CoMomentAccumulator:
+    """Pairwise-complete co-moments of numeric columns, updated chunk by chunk.
+
+    For every pair of columns it keeps the number of rows where both are
+    present and the sums of x, y, x², y² and x·y over those rows, which is
+    all Pearson needs. Each update is a handful of matrix products computed
+    on column blocks in a thread pool (NumPy releases the GIL in BLAS).
+    Values are shifted by the first chunk's means for numerical stability.
+    """
+
+    def __init__(self, columns, block_size=BLOCK_SIZE, workers=None):
+        self.columns = list(columns)
+        self.block_size = block_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        p = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((p, p))
+        self.sum_x = np.zeros((p, p))
+        self.sum_xx = np.zeros((p, p))
+        self.sum_xy = np.zeros((p, p))
+        self.rows = 0
+
+    def update(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                col_means = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.columns))
+            self.shift = np.nan_to_num(col_means)
+        valid = ~np.isnan(values)
+        x = np.where(valid, values - self.shift, 0.0)
+        mask = valid.astype("float64")
+
+        p = len(self.columns)
+        blocks = [slice(i, min(i + self.block_size, p)) for i in range(0, p, self.block_size)]
+        pairs = [(bi, bj) for bi in blocks for bj in blocks]
+
+        def accumulate(pair):
+            bi, bj = pair
+            self.n[bi, bj] += mask[:, bi].T @ mask[:, bj]
+            self.sum_x[bi, bj] += x[:, bi].T @ mask[:, bj]
+            self.sum_xx[bi, bj] += (x[:, bi] ** 2).T @ mask[:, bj]
+            self.sum_xy[bi, bj] += x[:, bi].T @ x[:, bj]
+
+        if len(pairs) == 1:
+            accumulate(pairs[0])
+        else:
+            # Each pair writes a disjoint block, so no locking is needed
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(accumulate, pairs))
+        self.rows += len(chunk)
+        return self
+
+    def correlation(self, min_periods=2):
+        """Pearson matrix; entry (i, j) uses rows where both columns exist."""
+        n = self.n
+        sum_y = self.sum_x.T
+        sum_yy = self.sum_xx.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sum_xy - self.sum_x * sum_y / n
+            var_x = self.sum_xx - self.sum_x ** 2 / n
+            var_y = sum_yy - sum_y ** 2 / n
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[n < min_periods] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.diag(var_x) > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _pearson(data):
+    return CoMomentAccumulator(data.columns).update(data).correlation()
+
+
+def spearman_matrix(data):
+    """Spearman correlation with pairwise-complete ranks, as ``DataFrame.corr``.
+
+    Columns without nulls are ranked once. A column with nulls is re-ranked
+    together with the others on the rows where it is present, and each pair
+    of columns with nulls is ranked on the rows where both are present.
+    """
+    corr = _pearson(data.rank(method="average"))
+    incomplete = [col for col in data.columns if data[col].isna().any()]
+    complete = [col for col in data.columns if col not in incomplete]
+    for i, col in enumerate(incomplete):
+        rows = data[data[col].notna()]
+        if complete:
+            part = _pearson(rows[[col] + complete].rank(method="average"))
+            corr.loc[col, complete] = part.loc[col, complete]
+            corr.loc[complete, col] = part.loc[complete, col]
+        for other in incomplete[i + 1:]:
+            pair = rows[[col, other]].dropna().rank(method="average")
+            value = _pearson(pair).loc[col, other]
+            corr.loc[col, other] = corr.loc[other, col] = value
+    return corr
+
+
+def correlation_matrix(df, columns, method="pearson"):
+    """Pearson or Spearman correlation of ``columns`` (pairwise complete)."""
+    data = df[columns]
+    if method == "spearman":
+        # Spearman is Pearson over ranks; ranks need the whole sample at once
+        return spearman_matrix(data)
+    return _pearson(data)
+
+
+def stream_correlation(source, separator, encoding, columns, chunksize=100_000):
+    """Pearson correlation over a whole CSV, read block by block."""
+    accumulator = CoMomentAccumulator(columns)
+    with pd.read_csv(source, sep=separator, encoding=encoding, usecols=columns, chunksize=chunksize) as reader:
+        for chunk in reader:
+            accumulator.update(chunk)
+    return accumulator.correlation()
+
+
+def top_pairs(corr, k=20):
+    """The ``k`` column pairs with the strongest absolute correlation."""
+    upper = np.triu(np.ones(corr.shape, dtype=bool), k=1)
+    # pandas 3 keeps NaN in stack(): drop the masked lower triangle and undefined pairs
+    pairs = corr.where(upper).stack().dropna().rename("Correlación").reset_index()
+    pairs.columns = ["Variable 1", "Variable 2", "Correlación"]
+    order = pairs["Correlación"].abs().sort_values(ascending=False, kind="stable").index
+    return pairs.loc[order].head(k).reset_index(drop=True)
+
+
+def cluster_order(corr):
+    """Column order that places strongly correlated variables next to each other.
+
+    Columns are sorted by their coordinate on the second eigenvector of the
+    absolute correlation matrix (a spectral seriation, NumPy only).
+    """
+    if len(corr) < 3:
+        return corr.columns.tolist()
+    strength = np.nan_to_num(corr.abs().to_numpy())
+    _, vectors = np.linalg.eigh(strength)
+    # The leading eigenvector is nearly uniform; the next one separates groups
+    order = np.argsort(vectors[:, -2])
+    return corr.columns[order].tolist()
+
+
+def strongest_columns(corr, threshold=0.5, max_columns=40):
+    """Columns having at least one partner with ``|r| >= threshold``."""
+    strength = corr.abs().where(~np.eye(len(corr), dtype=bool)).max()
+    strength = strength[strength >= threshold].sort_values(ascending=False)
+    return strength.index[:max_columns].tolist()
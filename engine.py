@@ -0,0 +1,200 @@
+import datetime
+import html
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from compaction import compact_frame
+from correlation import correlation_matrix, top_pairs
+from fingerprints import FingerprintIndex
+from ingestion import content_hash
+from profiling import profile_frame
+from timeseries import prepare_time_index
+
+# Bumped whenever the report layout changes; older reports are ignored
+REPORT_VERSION = 1
+# Where the batch CLI writes reports and the dashboard looks for them
+REPORTS_DIR = os.environ.get("DATAINSIGHT_REPORTS_DIR", "reports")
+REPORT_INDEX = "index.json"
+TOP_PAIRS = 20
+
+# Report entries that hold DataFrames / dicts of Series
+_FRAMES = ("overview", "numeric", "categorical")
+
+
+def analyze_frame(df, optimize_types=True):
+    """Everything the dashboard computes for a full dataset, without Streamlit.
+
+    Applies the same dtype compaction, profile, duplicate count, Pearson
+    correlation and monthly rollups as the app, so a report matches what
+    the dashboard would show for the whole file.
+    """
+    type_report = None
+    if optimize_types:
+        df, type_report = compact_frame(df)
+    profile = profile_frame(df)
+    num_cols = profile["numeric_columns"]
+
+    corr = correlation_matrix(df, num_cols) if len(num_cols) >= 2 else None
+
+    monthly = {}
+    for col in df.columns:
+        if col in num_cols:
+            continue
+        time_index = prepare_time_index(df, col, num_cols)
+        if time_index is not None and "month" in time_index["pyramid"]:
+            monthly[col] = time_index["pyramid"]["month"].xs("mean", axis=1, level=1)
+
+    return {
+        "profile": profile,
+        "duplicates": FingerprintIndex().duplicate_count(df),
+        "type_report": type_report,
+        "correlation": corr,
+        "top_pairs": top_pairs(corr, TOP_PAIRS) if corr is not None else None,
+        "monthly": monthly,
+    }
+
+
+def analyze_csv(path, separator=",", encoding="utf-8", optimize_types=True):
+    """Read ``path`` the way the dashboard does and analyze it."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    df = pd.read_csv(io.BytesIO(raw), sep=separator, encoding=encoding)
+    report = analyze_frame(df, optimize_types)
+    report.update({
+        "version": REPORT_VERSION,
+        "source": os.path.basename(path),
+        # Same key the dashboard derives from an upload of this file
+        "data_key": content_hash(raw, separator, encoding),
+        "separator": separator,
+        "encoding": encoding,
+        "optimize_types": optimize_types,
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    })
+    return report
+
+
+# --- Serialization ---
+def _plain(value):
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.isoformat()
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def _frame_to_dict(df):
+    if df is None:
+        return None
+    return {
+        "index": [_plain(v) for v in df.index],
+        "columns": [str(c) for c in df.columns],
+        "data": [[_plain(v) for v in row] for row in df.itertuples(index=False)],
+    }
+
+
+def _frame_from_dict(data):
+    if data is None:
+        return None
+    return pd.DataFrame(data["data"], index=data["index"], columns=data["columns"])
+
+
+def _series_to_dict(series):
+    return {"index": [_plain(v) for v in series.index], "values": [_plain(v) for v in series]}
+
+
+def _series_from_dict(data, name="count"):
+    return pd.Series(data["values"], index=data["index"], name=name, dtype="int64")
+
+
+def report_to_json(report):
+    profile = report["profile"]
+    payload = {k: v for k, v in report.items() if k not in ("profile", "type_report", "correlation", "top_pairs", "monthly")}
+    payload["profile"] = {
+        **{k: v for k, v in profile.items() if k not in _FRAMES + ("top_values",)},
+        **{k: _frame_to_dict(profile[k]) for k in _FRAMES},
+        "top_values": {col: _series_to_dict(s) for col, s in profile["top_values"].items()},
+    }
+    payload["type_report"] = _frame_to_dict(report["type_report"])
+    payload["correlation"] = _frame_to_dict(report["correlation"])
+    payload["top_pairs"] = _frame_to_dict(report["top_pairs"])
+    payload["monthly"] = {col: _frame_to_dict(frame) for col, frame in report["monthly"].items()}
+    return json.dumps(payload, ensure_ascii=False, default=_plain)
+
+
+def report_from_json(text):
+    """Inverse of ``report_to_json``: rebuilds the DataFrames of the report."""
+    payload = json.loads(text)
+    profile = payload["profile"]
+    for k in _FRAMES:
+        profile[k] = _frame_from_dict(profile[k])
+    profile["top_values"] = {col: _series_from_dict(s) for col, s in profile["top_values"].items()}
+    payload["type_report"] = _frame_from_dict(payload["type_report"])
+    payload["correlation"] = _frame_from_dict(payload["correlation"])
+    payload["top_pairs"] = _frame_from_dict(payload["top_pairs"])
+    payload["monthly"] = {col: _frame_from_dict(frame) for col, frame in payload["monthly"].items()}
+    return payload
+
+
+def report_to_html(report):
+    """Standalone HTML page with the report tables."""
+    profile = report["profile"]
+    # File and column names come from user data; the tables escape their own cells
+    source = html.escape(str(report["source"]))
+    sections = [
+        f"<h1>{source}</h1>",
+        f"<p>Filas: <b>{profile['rows']:,}</b> | Columnas: <b>{profile['columns']}</b> | "
+        f"Celdas vacías: <b>{profile['null_cells']:,}</b> | Duplicados: <b>{report['duplicates']:,}</b> | "
+        f"Generado: {report['generated_at']}</p>",
+        "<h2>Resumen por columna</h2>", profile["overview"].to_html(),
+        "<h2>Variables numéricas</h2>", profile["numeric"].to_html(float_format="{:.4g}".format),
+        "<h2>Variables categóricas</h2>", profile["categorical"].to_html(),
+    ]
+    for col, counts in profile["top_values"].items():
+        sections += [f"<h3>Top valores: {html.escape(str(col))}</h3>", counts.to_frame("Frecuencia").to_html()]
+    if report["top_pairs"] is not None:
+        sections += ["<h2>Parejas más correlacionadas</h2>", report["top_pairs"].to_html(index=False, float_format="{:.3f}".format)]
+    for col, frame in report["monthly"].items():
+        sections += [f"<h2>Promedio mensual por {html.escape(str(col))}</h2>", frame.to_html(float_format="{:.4g}".format)]
+    if report["type_report"] is not None:
+        sections += ["<h2>Optimización de tipos</h2>", report["type_report"].to_html(index=False)]
+    body = "\n".join(sections)
+    return f"<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>{source}</title></head>\n<body>\n{body}\n</body></html>\n"
+
+
+# --- Report lookup ---
+def index_key(data_key, optimize_types):
+    return f"{data_key}|{optimize_types}"
+
+
+def read_report_index(reports_dir=REPORTS_DIR):
+    """``{index_key: json file name}`` written by the batch CLI, or {}."""
+    path = os.path.join(reports_dir, REPORT_INDEX)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_report(reports_dir, data_key, optimize_types):
+    """Precomputed report for an upload, or None if there is none."""
+    name = read_report_index(reports_dir).get(index_key(data_key, optimize_types))
+    if name is None:
+        return None
+    try:
+        with open(os.path.join(reports_dir, name), encoding="utf-8") as f:
+            report = report_from_json(f.read())
+    except (OSError, ValueError, KeyError):
+        return None
+    if report.get("version") != REPORT_VERSION or report.get("data_key") != data_key:
+        return None
+    return report
@@ -0,0 +1,102 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Columns with more distinct values than this get no per-value bitmaps
+MAX_BITMAP_VALUES = 500
+
+
+class CategoryBitmaps:
+    """One packed bitmap (1 bit per row) for every distinct value of a column."""
+
+    def __init__(self, series):
+        codes, self.values = pd.factorize(series, sort=True)
+        self.n_rows = len(series)
+        # Group row positions by code once, then set each value's bits
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.values) + 1))
+        self.bitmaps = {}
+        for code, value in enumerate(self.values):
+            bits = np.zeros(self.n_rows, dtype=bool)
+            bits[order[bounds[code]:bounds[code + 1]]] = True
+            self.bitmaps[value] = np.packbits(bits)
+
+    def select(self, values):
+        """Packed bitmap of rows holding any of ``values`` (bitwise OR)."""
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in self.bitmaps:
+                result |= self.bitmaps[value]
+        return result
+
+
+class SortedIndex:
+    """Sorted values of a numeric/date column with their row positions."""
+
+    def __init__(self, series):
+        values = series.to_numpy()
+        valid = ~pd.isna(values)
+        positions = np.flatnonzero(valid)
+        order = np.argsort(values[valid], kind="stable")
+        self.sorted_values = values[valid][order]
+        self.positions = positions[order]
+        self.n_rows = len(series)
+
+    def bounds(self):
+        if len(self.sorted_values) == 0:
+            return None, None
+        return self.sorted_values[0], self.sorted_values[-1]
+
+    def select(self, low, high):
+        """Packed bitmap of rows with ``low <= value <= high`` (two binary searches)."""
+        start = np.searchsorted(self.sorted_values, low, side="left")
+        stop = np.searchsorted(self.sorted_values, high, side="right")
+        bits = np.zeros(self.n_rows, dtype=bool)
+        bits[self.positions[start:stop]] = True
+        return np.packbits(bits)
+
+
+class FilterIndex:
+    """Per-column bitmap and sorted indexes of one dataset view.
+
+    Indexes are built lazily, the first time a column is filtered, and kept
+    for the life of the view. Predicates map a column to ``("in", values)``
+    or ``("range", (low, high))``; combining them is a bitwise AND of the
+    packed bitmaps.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def is_range_column(self, column):
+        series = self.df[column]
+        return (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)) \
+            or pd.api.types.is_datetime64_any_dtype(series)
+
+    def index(self, column):
+        with self._lock:
+            if column not in self._indexes:
+                series = self.df[column]
+                if self.is_range_column(column):
+                    self._indexes[column] = SortedIndex(series)
+                elif series.nunique() <= MAX_BITMAP_VALUES:
+                    self._indexes[column] = CategoryBitmaps(series)
+                else:
+                    self._indexes[column] = None
+            return self._indexes[column]
+
+    def mask(self, predicates):
+        """Boolean row mask of the rows matching every predicate, or None."""
+        combined = None
+        for column, (kind, arg) in predicates.items():
+            index = self.index(column)
+            if index is None:
+                continue
+            bits = index.select(*arg) if kind == "range" else index.select(arg)
+            combined = bits if combined is None else combined & bits
+        if combined is None:
+            return None
+        return np.unpackbits(combined, count=len(self.df)).astype(bool)
@@ -0,0 +1,61 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df, subset=None):
+    """One 64-bit hash per row over ``subset`` (all columns by default)."""
+    cols = list(subset) if subset else list(df.columns)
+    if not cols:
+        return pd.Series(np.zeros(len(df), dtype="uint64"), index=df.index)
+    return pd.util.hash_pandas_object(df[cols], index=False)
+
+
+class FingerprintIndex:
+    """Row fingerprints of one dataset, reused across reruns and samples.
+
+    Hashes are stored per set of key columns and indexed by row label, so a
+    sample that grows only hashes the rows it has not seen before. Equal
+    fingerprints are treated as equal rows (64-bit collisions are ignored).
+    """
+
+    def __init__(self):
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def hashes(self, df, subset=None):
+        cols = tuple(subset) if subset else tuple(df.columns)
+        # dtypes are part of the key: 1 and 1.0 hash differently
+        key = (cols, tuple(str(dtype) for dtype in df.dtypes[list(cols)]))
+        with self._lock:
+            known = self._hashes.get(key)
+        if known is None:
+            known = row_hashes(df, cols)
+        else:
+            missing = df.index.difference(known.index)
+            if len(missing):
+                known = pd.concat([known, row_hashes(df.loc[missing], cols)])
+        with self._lock:
+            self._hashes[key] = known
+        if known.index.equals(df.index):
+            return known
+        return known.reindex(df.index)
+
+    def duplicate_mask(self, df, subset=None):
+        """Boolean array, True for every repeat after the first occurrence."""
+        return self.hashes(df, subset).duplicated().to_numpy()
+
+    def duplicate_count(self, df, subset=None):
+        return int(self.duplicate_mask(df, subset).sum())
+
+    def duplicate_groups(self, df, subset=None):
+        """Rows that have at least one duplicate, labelled by ``Grupo``."""
+        hashes = self.hashes(df, subset)
+        in_group = hashes.duplicated(keep=False).to_numpy()
+        group_ids = pd.factorize(hashes[in_group])[0] + 1
+        groups = df[in_group].assign(Grupo=group_ids)
+        return groups.sort_values("Grupo", kind="stable")
+
+    def drop_duplicates(self, df, subset=None):
+        return df[~self.duplicate_mask(df, subset)]
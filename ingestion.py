@@ -0,0 +1,298 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from compaction import compact_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Sidecars are optional, the in-memory cache still works
+    feather = None
+
+# Where the columnar sidecars are written (one .arrow file per upload hash)
+CACHE_DIR = os.environ.get("DATAINSIGHT_CACHE_DIR", os.path.join(".cache", "datainsight"))
+# Max number of parsed DataFrames kept in RAM at the same time
+MEMORY_CACHE_ENTRIES = 4
+# Disk budget of the sidecars; the least recently used files go first
+SIDECAR_MAX_BYTES = int(os.environ.get("DATAINSIGHT_CACHE_MAX_MB", 2048)) * 2 ** 20
+# Schema metadata field of a sidecar holding the dtype compaction report
+TYPE_REPORT_FIELD = b"datainsight.type_report"
+
+
+def content_hash(raw_bytes, separator, encoding):
+    """Key for an upload: the file bytes plus the settings used to parse them."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(raw_bytes)
+    digest.update(f"\0{separator}\0{encoding}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class IngestionCache:
+    """Bounded LRU of parsed uploads backed by Arrow (Feather) sidecars on disk.
+
+    Lookups go memory -> sidecar (memory-mapped) -> ``pd.read_csv``. With
+    ``optimize_types`` the frame is compacted once, right after parsing, and
+    only the compact copy is kept (in RAM and on disk, with its type report).
+    The frames handed out are shared between reruns and sessions, so callers
+    must treat them as read-only.
+    """
+
+    def __init__(self, max_entries=MEMORY_CACHE_ENTRIES, cache_dir=CACHE_DIR, max_disk_bytes=SIDECAR_MAX_BYTES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def sidecar_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    @staticmethod
+    def entry_key(key, optimize_types):
+        # Raw and compacted copies of an upload are separate entries
+        return f"{key}-compact" if optimize_types else key
+
+    def get(self, key, optimize_types=False):
+        """Return ``(df, type_report, source)`` for a cached key, or ``(None, None, None)``."""
+        entry = self.entry_key(key, optimize_types)
+        with self._lock:
+            if entry in self._frames:
+                self._frames.move_to_end(entry)
+                self.stats["memory_hits"] += 1
+                return (*self._frames[entry], "memory")
+
+        cached = self._read_sidecar(entry)
+        if cached is not None:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._remember(entry, cached)
+            return (*cached, "disk")
+        return None, None, None
+
+    def load(self, raw_bytes, separator, encoding, key=None, optimize_types=False):
+        """Return ``(df, type_report, key, source)`` parsing the CSV only on a full miss."""
+        if key is None:
+            key = content_hash(raw_bytes, separator, encoding)
+
+        df, type_report, source = self.get(key, optimize_types)
+        if df is not None:
+            return df, type_report, key, source
+
+        df = pd.read_csv(io.BytesIO(raw_bytes), sep=separator, encoding=encoding)
+        if optimize_types:
+            df, type_report = compact_frame(df)
+        entry = self.entry_key(key, optimize_types)
+        self._write_sidecar(entry, df, type_report)
+        with self._lock:
+            self.stats["misses"] += 1
+            self._remember(entry, (df, type_report))
+        return df, type_report, key, "parsed"
+
+    def memory_usage(self):
+        with self._lock:
+            frames = [df for df, _ in self._frames.values()]
+        return int(sum(frame.memory_usage(deep=False).sum() for frame in frames))
+
+    def __len__(self):
+        return len(self._frames)
+
+    # --- internals ---
+    def _remember(self, key, cached):
+        # Caller holds the lock; ``cached`` is ``(df, type_report)``
+        self._frames[key] = cached
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _read_sidecar(self, key):
+        path = self.sidecar_path(key)
+        if feather is None or not os.path.exists(path):
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            # The mtime orders sidecars for eviction, so a hit counts as a use
+            os.utime(path)
+            report = (table.schema.metadata or {}).get(TYPE_REPORT_FIELD)
+            type_report = pd.DataFrame(json.loads(report)) if report is not None else None
+            return table.to_pandas(), type_report
+        except Exception:
+            # A truncated or incompatible sidecar is just a miss
+            return None
+
+    def _write_sidecar(self, key, df, type_report=None):
+        if feather is None:
+            return
+        path = self.sidecar_path(key)
+        # Sessions are threads of one process: the thread id keeps their temp files apart
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if type_report is not None:
+                metadata = dict(table.schema.metadata or {})
+                metadata[TYPE_REPORT_FIELD] = type_report.to_json(orient="records").encode("utf-8")
+                table = table.replace_schema_metadata(metadata)
+            # Uncompressed so the file can be memory-mapped on the way back
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        except Exception:
+            # Mixed-type object columns can't always be expressed in Arrow
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._prune_sidecars(keep=path)
+
+    def _prune_sidecars(self, keep):
+        """Delete the least recently used sidecars until they fit ``max_disk_bytes``."""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".arrow") and entry.path != keep:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                # Frames already mapped from it stay valid on POSIX
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+# --- Sampling ---
+SAMPLING_METHODS = ("head", "uniform", "stratified")
+# Rows parsed per block by the streaming reader
+STREAM_CHUNKSIZE = 100_000
+# Most strata a stratified sample accepts; more usually means an identifier column
+MAX_STRATA = 100
+
+
+class TooManyStrata(ValueError):
+    """The stratum column has too many distinct values to stratify by."""
+
+
+def _too_many_strata(strata_col, n_strata):
+    return TooManyStrata(
+        f"La columna '{strata_col}' tiene más de {MAX_STRATA} valores distintos ({n_strata:,}) "
+        "y no sirve para estratificar (¿es un identificador?)."
+    )
+
+
+def proportional_allocation(counts, size):
+    """Split ``size`` rows across strata proportionally (largest remainder)."""
+    total = int(counts.sum())
+    if total <= size:
+        return counts.astype(int)
+    exact = counts * size / total
+    alloc = np.floor(exact).astype(int)
+    remainder = int(size - alloc.sum())
+    if remainder:
+        leftovers = (exact - alloc).sort_values(ascending=False, kind="stable")
+        alloc[leftovers.index[:remainder]] += 1
+    return alloc
+
+
+def sample_frame(df, size, method="head", strata_col=None, seed=0):
+    """Sample an in-memory frame, keeping the original row order."""
+    if size >= len(df):
+        return df
+    if method == "head":
+        return df.head(size)
+    if method == "uniform":
+        return df.sample(n=size, random_state=seed).sort_index()
+    if method == "stratified":
+        strata = df[strata_col].astype(str)
+        if strata.nunique() > MAX_STRATA:
+            raise _too_many_strata(strata_col, strata.nunique())
+        alloc = proportional_allocation(strata.value_counts(), size)
+        shuffled = df.sample(frac=1, random_state=seed)
+        rank = shuffled.groupby(strata.loc[shuffled.index], sort=False).cumcount()
+        keep = rank < strata.loc[shuffled.index].map(alloc)
+        return shuffled[keep].sort_index()
+    raise ValueError(f"Método de muestreo desconocido: {method}")
+
+
+def stream_sample(source, separator, encoding, size, method="head", strata_col=None,
+                  seed=0, chunksize=STREAM_CHUNKSIZE):
+    """Sample a CSV block by block without materializing the whole file.
+
+    ``source`` is a path, raw bytes or a binary file object. Uniform and stratified samples are
+    reservoirs: every row gets a random key and only the ``size`` smallest
+    keys (per stratum) survive each block. Stratified sampling accepts at
+    most ``MAX_STRATA`` strata, so peak memory is bounded by
+    ``MAX_STRATA * size`` rows plus one block (``size`` plus one block for
+    uniform samples). Returns ``(sample_df, total_rows)``.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Método de muestreo desconocido: {method}")
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    reader = pd.read_csv(source, sep=separator, encoding=encoding, chunksize=chunksize)
+
+    rng = np.random.default_rng(seed)
+    reservoir = None
+    strata_counts = pd.Series(dtype="int64")
+    total_rows = 0
+
+    with reader:
+        for chunk in reader:
+            total_rows += len(chunk)
+            if method == "head":
+                if reservoir is None or len(reservoir) < size:
+                    head = chunk.head(size - (0 if reservoir is None else len(reservoir)))
+                    reservoir = head if reservoir is None else pd.concat([reservoir, head])
+                continue
+
+            chunk["_sample_key"] = rng.random(len(chunk))
+            if method == "stratified":
+                chunk["_stratum"] = chunk[strata_col].astype(str)
+                strata_counts = strata_counts.add(chunk["_stratum"].value_counts(), fill_value=0)
+                if len(strata_counts) > MAX_STRATA:
+                    raise _too_many_strata(strata_col, len(strata_counts))
+            else:
+                chunk["_stratum"] = ""
+
+            # Per-stratum smallest keys: trim the block first, then merge with the
+            # (already bounded) reservoir, without re-sorting everything kept so far
+            chunk = _smallest_keys(chunk, size)
+            reservoir = chunk if reservoir is None else _smallest_keys(pd.concat([reservoir, chunk]), size)
+
+    if reservoir is None:
+        return pd.DataFrame(), 0
+    if method == "head":
+        return reservoir, total_rows
+
+    if method == "stratified":
+        alloc = proportional_allocation(strata_counts.astype("int64"), size)
+        rank = reservoir.groupby("_stratum", sort=False)["_sample_key"].rank(method="first")
+        reservoir = reservoir[rank <= reservoir["_stratum"].map(alloc)]
+    else:
+        reservoir = reservoir.nsmallest(size, "_sample_key")
+    return reservoir.drop(columns=["_sample_key", "_stratum"]).sort_index(), total_rows
+
+
+def _smallest_keys(frame, size):
+    """Rows holding the ``size`` smallest ``_sample_key`` of each stratum."""
+    rank = frame.groupby("_stratum", sort=False)["_sample_key"].rank(method="first")
+    return frame[rank <= size]
+
+
+def read_header(source, separator, encoding):
+    """Column names of a CSV without parsing any data rows."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pd.read_csv(source, sep=separator, encoding=encoding, nrows=0).columns.tolist()
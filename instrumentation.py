@@ -0,0 +1,148 @@
+import datetime
+import json
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Reruns kept in the rolling history of a session
+HISTORY_RUNS = 50
+
+# tracemalloc is process-wide: it runs while any session has the panel enabled
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0
+# Its peak counter is global too, so traced stages of different sessions take turns
+_stage_lock = threading.RLock()
+
+
+def _acquire_tracing():
+    global _tracing_sessions
+    with _tracing_lock:
+        _tracing_sessions += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _release_tracing():
+    global _tracing_sessions
+    with _tracing_lock:
+        _tracing_sessions = max(_tracing_sessions - 1, 0)
+        if _tracing_sessions == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class RerunRecorder:
+    """Wall time, peak memory and payload size of the stages of each rerun.
+
+    ``begin_run`` opens a new entry in the rolling history; ``stage`` and
+    ``chart`` add records to it. Fragment reruns do not open a run, so
+    their records are added to the run that last rendered the page. Peak
+    memory needs tracemalloc, which is only running while the recorder is
+    enabled; it counts every allocation of the process during the stage.
+    Tracing is released when the recorder is disabled or garbage collected
+    (the session ended).
+    """
+
+    def __init__(self, history_runs=HISTORY_RUNS):
+        self.history = deque(maxlen=history_runs)
+        self.enabled = False
+        self._run = None
+        self._release = None
+        # One frame per open stage: [start_memory, highest peak seen by children]
+        self._stack = []
+
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            _acquire_tracing()
+            # Runs once: on disable, or when a closed session drops the recorder
+            self._release = weakref.finalize(self, _release_tracing)
+        elif not enabled and self.enabled:
+            self._release()
+        self.enabled = enabled
+
+    def begin_run(self, **context):
+        """Start recording a rerun; ``context`` describes the dataset view."""
+        self._stack = []
+        if not self.enabled:
+            self._run = None
+            return
+        self._run = {
+            "run": (self.history[-1]["run"] + 1) if self.history else 1,
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+            "context": context,
+            "stages": [],
+        }
+        self.history.append(self._run)
+
+    def annotate(self, **context):
+        """Add details of the dataset view (shape, settings) to the current run."""
+        if self._run is not None:
+            self._run["context"].update(context)
+
+    def _record(self, name, kind):
+        # Added when the stage starts so nested stages are listed after their parent
+        record = {"stage": name, "kind": kind, "depth": len(self._stack),
+                  "ms": None, "peak_mb": None, "payload_kb": None}
+        self._run["stages"].append(record)
+        return record
+
+    @contextmanager
+    def stage(self, name):
+        if self._run is None:
+            yield
+            return
+        record = self._record(name, "etapa")
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            _stage_lock.acquire()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # reset_peak below would lose the parent's peak so far
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._stack.append([current, 0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            if tracing and self._stack:
+                start_memory, child_peak = self._stack.pop()
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, child_peak)
+                record["peak_mb"] = round(max(peak - start_memory, 0) / 2 ** 20, 2)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+            if tracing:
+                _stage_lock.release()
+
+    def chart(self, name, fig):
+        """Record the serialized size of a Plotly figure (what the browser receives)."""
+        if self._run is None:
+            return
+        record = self._record(name, "gráfico")
+        start = time.perf_counter()
+        payload = len(fig.to_json().encode("utf-8"))
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        record["payload_kb"] = round(payload / 1024, 1)
+
+    def last_run(self):
+        return self.history[-1] if self.history else None
+
+    def history_frame(self):
+        """One row per recorded stage of every run in the history."""
+        rows = []
+        for run in self.history:
+            for record in run["stages"]:
+                rows.append({"run": run["run"], "started": run["started"], **run["context"], **record})
+        return pd.DataFrame(rows)
+
+    def to_json(self):
+        return json.dumps(list(self.history), ensure_ascii=False, indent=1, default=str)
+
+    def to_csv(self):
+        return self.history_frame().to_csv(index=False)
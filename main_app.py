@@ -4,6 +4,20 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import io
+import os
+from ingestion import IngestionCache, TooManyStrata, content_hash, read_header, sample_frame, stream_sample
+from profiling import TOP_VALUES, profile_frame
+from sketches import MAX_COLOR_GROUPS, bucket_top, is_high_cardinality, stream_sketches
+from fingerprints import FingerprintIndex
+from correlation import MAX_ANNOTATED_COLUMNS, cluster_order, correlation_matrix, stream_correlation, strongest_columns, top_pairs
+from timeseries import prepare_time_index
+from compaction import compact_frame
+from preview import PAGE_SIZES, page_positions, range_mask, sort_positions, text_mask
+from filters import FilterIndex, SortedIndex
+from engine import REPORT_INDEX, REPORTS_DIR, load_report
+from instrumentation import RerunRecorder
+from assistant import ANALYSIS_PROMPT, DEFAULT_BASE_URL, DEFAULT_MODEL, SUMMARY_TOKEN_BUDGET, SYSTEM_PROMPT, AnalysisJob, ResponseCache, build_summary, estimate_tokens, request_key
+from charts import MAX_PLOT_POINTS, bin_scatter, numeric_summary, reduce_series
 
 # Page Configuration
 st.set_page_config(
@@ -23,6 +37,633 @@ try:
 except FileNotFoundError:
     st.warning("Archivo style.css no encontrado. Asegúrate de que esté en el mismo directorio.")
 
+@st.cache_resource
+def get_ingestion_cache():
+    # One cache per server process, shared by every session
+    return IngestionCache()
+
+def upload_key(uploaded_file, separator, encoding):
+    # Hash the upload once per file/settings instead of on every rerun
+    file_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    memo = st.session_state.setdefault("_upload_hashes", {})
+    memo_key = (file_id, separator, encoding)
+    if memo_key not in memo:
+        memo[memo_key] = content_hash(uploaded_file.getvalue(), separator, encoding)
+    return memo[memo_key]
+
+# Rows kept by default when the file is read in streaming mode
+DEFAULT_STREAM_SAMPLE = 50_000
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_stream_sample(_uploaded_file, data_key, separator, encoding, sample_size, method, strata_col):
+    # data_key identifies the upload, so the file object itself is not hashed
+    _uploaded_file.seek(0)
+    return stream_sample(_uploaded_file, separator, encoding, sample_size, method, strata_col)
+
+@st.cache_resource(max_entries=8)
+def get_fingerprint_index(data_key, read_mode):
+    # Row hashes are computed once per loaded dataset and grow with the sample
+    return FingerprintIndex()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_profile(_df, view_key):
+    # view_key = dataset hash + sampling settings, so the frame is never hashed
+    return profile_frame(_df)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_precomputed_report(data_key, optimize_types, index_mtime):
+    # index_mtime makes the lookup notice when the batch CLI rewrites its index
+    return load_report(REPORTS_DIR, data_key, optimize_types)
+
+def report_index_mtime():
+    path = os.path.join(REPORTS_DIR, REPORT_INDEX)
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def get_numeric_summary(_df, view_key, column):
+    # Histogram/box statistics per column, so switching variables is a lookup
+    return numeric_summary(_df[column])
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_correlation(_df, view_key, columns, method):
+    return correlation_matrix(_df, columns, method)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_file_correlation(_uploaded_file, data_key, separator, encoding, columns):
+    # Pearson over every row of the file, accumulated block by block
+    _uploaded_file.seek(0)
+    return stream_correlation(_uploaded_file, separator, encoding, columns)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_file_sketches(_uploaded_file, data_key, separator, encoding, columns):
+    # HyperLogLog + Misra-Gries per column over every row of the file
+    _uploaded_file.seek(0)
+    return stream_sketches(_uploaded_file, separator, encoding, columns)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_time_index(_df, view_key, date_col, numeric_cols):
+    # Parsed/sorted index + rollup pyramid, shared read-only between reruns
+    return prepare_time_index(_df, date_col, list(numeric_cols))
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_compacted(_df, compact_key):
+    # Compact dtypes once per streamed sample (full loads are compacted by the ingestion cache)
+    return compact_frame(_df)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def get_sort_positions(_df, view_key, column, ascending):
+    # Sort index per column/direction, reused by every page of the preview
+    return sort_positions(_df, column, ascending)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def get_preview_mask(_df, view_key, column, text, value_range):
+    if text:
+        return text_mask(_df[column], text)
+    return range_mask(_df[column], *value_range)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_filter_index(_df, view_key):
+    # Bitmap/sorted indexes of the unfiltered view, built column by column on demand
+    return FilterIndex(_df)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_filter_positions(_filter_index, view_key, _predicates):
+    # view_key already includes the predicates; only the row positions are kept,
+    # so cached combinations cost an int per matching row, not a copy of the frame
+    return np.flatnonzero(_filter_index.mask(_predicates))
+
+@st.cache_resource(show_spinner=False)
+def get_ai_client(base_url, api_key):
+    # One client (and HTTP connection pool) per server and key, reused by every request
+    from openai import OpenAI
+    return OpenAI(base_url=base_url, api_key=api_key)
+
+@st.cache_resource
+def get_response_cache():
+    # Streamed and finished AI responses, shared by every session
+    return ResponseCache()
+
+def get_recorder():
+    # One recorder (and rolling history of reruns) per browser session
+    if "_perf_recorder" not in st.session_state:
+        st.session_state["_perf_recorder"] = RerunRecorder()
+    return st.session_state["_perf_recorder"]
+
+def show_chart(fig):
+    # Every chart goes through here so the performance panel sees its payload
+    get_recorder().chart(fig.layout.title.text or "Gráfico", fig)
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_perf_panel(recorder):
+    run = recorder.last_run()
+    with st.sidebar.expander("🐞 Rendimiento por etapa", expanded=True):
+        if run is None or not run["stages"]:
+            st.caption("Todavía no hay mediciones.")
+            return
+        stages = pd.DataFrame(run["stages"])
+        total_ms = stages.loc[(stages["kind"] == "etapa") & (stages["depth"] == 0), "ms"].sum()
+        st.caption(f"Ejecución #{run['run']} ({run['started']}): **{total_ms:,.0f} ms** medidos")
+        st.caption("Pico MB es memoria de todo el proceso durante la etapa; con el panel activo en varias sesiones, sus etapas medidas se ejecutan por turnos.")
+        stages["stage"] = [" " * depth + name for depth, name in zip(stages["depth"], stages["stage"])]
+        st.dataframe(
+            stages.drop(columns="depth").rename(columns={
+                "stage": "Etapa", "kind": "Tipo", "peak_mb": "Pico MB", "payload_kb": "Payload KB"
+            }),
+            use_container_width=True, hide_index=True
+        )
+
+        history = recorder.history_frame()
+        top_level = history[(history["kind"] == "etapa") & (history["depth"] == 0)]
+        totals = top_level.groupby("run", as_index=False)["ms"].sum()
+        if len(totals) > 1:
+            fig_runs = px.bar(totals, x="run", y="ms", labels={"run": "Ejecución", "ms": "ms"}, height=200)
+            fig_runs.update_layout(margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+            st.plotly_chart(fig_runs, use_container_width=True)
+
+        c_json, c_csv = st.columns(2)
+        c_json.download_button("⬇️ JSON", recorder.to_json(), file_name="rendimiento.json", mime="application/json")
+        c_csv.download_button("⬇️ CSV", recorder.to_csv(), file_name="rendimiento.csv", mime="text/csv")
+
+# --- TAB RENDERERS ---
+# Each tab (and each independent control group) is a fragment: interacting
+# with its widgets reruns only that fragment instead of the whole script.
+
+def render_general_tab(df, profile, view_key, fingerprints, dup_keys, type_report, report):
+    # Duplicate settings live in the sidebar so they survive tab switches
+    if report is not None and not dup_keys:
+        # Whole-row duplicates of the whole file were counted by the batch report
+        n_duplicates = report["duplicates"]
+    else:
+        with get_recorder().stage("Conteo de duplicados"):
+            n_duplicates = fingerprints.duplicate_count(df, dup_keys)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1: st.metric("Filas", df.shape[0])
+    with col2: st.metric("Columnas", df.shape[1])
+    with col3: st.metric("Duplicados", n_duplicates)
+    with col4: st.metric("Celdas Vacías", profile["null_cells"])
+
+    with st.expander("🧬 Detección de Duplicados"):
+        st.caption("Las columnas clave y la eliminación de duplicados se configuran en el panel lateral (Muestreo).")
+        # Without duplicates there are no groups to hash the rows for
+        dup_groups = fingerprints.duplicate_groups(df, dup_keys) if n_duplicates else None
+        if dup_groups is None or dup_groups.empty:
+            st.success("No hay filas duplicadas con las columnas clave seleccionadas.")
+        else:
+            st.write(f"**{dup_groups['Grupo'].nunique()}** grupos de duplicados ({len(dup_groups)} filas)")
+            st.dataframe(dup_groups.head(500), use_container_width=True)
+
+    if type_report is not None:
+        with st.expander("🗜️ Optimización de Tipos y Memoria"):
+            mem_before = type_report["Memoria antes (KB)"].sum()
+            mem_after = type_report["Memoria después (KB)"].sum()
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Memoria original", f"{mem_before / 1024:,.2f} MB")
+            m2.metric("Memoria optimizada", f"{mem_after / 1024:,.2f} MB")
+            m3.metric("Ahorro", f"{(1 - mem_after / mem_before) * 100 if mem_before else 0:.1f}%")
+            st.dataframe(type_report, use_container_width=True, hide_index=True)
+
+    render_preview(df, profile, view_key)
+
+    # Missing Values Chart
+    st.subheader("⚠️ Mapa de Valores Nulos")
+    nulls = profile["overview"]["nulls"]
+    if nulls.sum() > 0:
+        fig_null = px.bar(
+            x=nulls.index, 
+            y=nulls.values,
+            labels={'x': 'Columna', 'y': 'Cantidad de Nulos'},
+            title="Valores Nulos por Columna",
+            color_discrete_sequence=['#ff6b6b']
+        )
+        fig_null.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        show_chart(fig_null)
+    else:
+        st.success("¡Excelente! No se detectaron valores nulos en el dataset.")
+
+@st.fragment
+def render_preview(df, profile, view_key):
+    st.markdown("### 🔍 Vista Previa")
+
+    # Sorting, filtering and paging run on the server; only one page is sent
+    columns = df.columns.tolist()
+    c_sort, c_order, c_filter, c_value = st.columns([2, 1, 2, 3])
+    with c_sort:
+        sort_col = st.selectbox("Ordenar por:", [None] + columns, key="preview_sort")
+    with c_order:
+        ascending = st.radio("Orden:", ["Asc", "Desc"], horizontal=True, key="preview_order") == "Asc"
+    with c_filter:
+        filter_col = st.selectbox("Filtrar columna:", [None] + columns, key="preview_filter_col")
+
+    text, value_range = None, None
+    with c_value:
+        if filter_col in profile["numeric_columns"]:
+            col_min, col_max = profile["numeric"].loc[filter_col, ["min", "max"]]
+            if pd.notna(col_min) and col_min < col_max:
+                value_range = st.slider("Rango:", float(col_min), float(col_max), (float(col_min), float(col_max)), key="preview_range")
+        elif filter_col is not None and pd.api.types.is_datetime64_any_dtype(df[filter_col]):
+            dates = st.date_input("Rango de fechas:", (df[filter_col].min(), df[filter_col].max()), key="preview_dates")
+            if len(dates) == 2:
+                value_range = (pd.Timestamp(dates[0]), pd.Timestamp(dates[1]) + pd.Timedelta(days=1) - pd.Timedelta(1))
+        elif filter_col is not None:
+            text = st.text_input("Contiene el texto:", key="preview_text").strip() or None
+
+    positions = get_sort_positions(df, view_key, sort_col, ascending)
+    mask = None
+    if filter_col is not None and (text or value_range):
+        mask = get_preview_mask(df, view_key, filter_col, text, value_range)
+    total = len(positions) if mask is None else int(mask.sum())
+
+    c_size, c_page, c_info = st.columns([1, 1, 3])
+    with c_size:
+        page_size = st.selectbox("Filas por página:", PAGE_SIZES, key="preview_page_size")
+    n_pages = max(1, -(-total // page_size))
+    with c_page:
+        page = st.number_input("Página:", min_value=1, max_value=n_pages, value=1, step=1, key="preview_page")
+    page = min(int(page), n_pages)
+    rows, total = page_positions(positions, mask, page, page_size)
+    with c_info:
+        first = (page - 1) * page_size + 1 if total else 0
+        st.caption(f"Filas {first:,}–{first + len(rows) - 1 if total else 0:,} de {total:,} (página {page} de {n_pages})")
+
+    st.dataframe(df.iloc[rows], use_container_width=True)
+
+@st.fragment
+def render_categorical_tab(df, profile, file_source):
+    # file_source = (uploaded_file, data_key, separator, encoding) in streaming mode, else None
+    st.markdown("### 📊 Análisis de Variables Categóricas")
+    cat_cols = profile["categorical_columns"]
+
+    if cat_cols:
+        col_sel, col_display = st.columns([1, 3])
+        with col_sel:
+            selected_cat_col = st.selectbox("Selecciona una columna (Categoría):", cat_cols)
+
+            use_full_file = False
+            if file_source is not None:
+                use_full_file = st.checkbox(
+                    "Calcular sobre el archivo completo (aproximado)",
+                    help="Recorre el archivo por bloques con sketches HyperLogLog (distintos) y Misra-Gries (más frecuentes)."
+                )
+            if use_full_file:
+                with st.spinner("Resumiendo el archivo por bloques..."):
+                    sketch = get_file_sketches(*file_source, cat_cols)[selected_cat_col]
+                top_counts = sketch.top(TOP_VALUES)
+                stats = pd.Series({
+                    "count": sketch.count,
+                    "unique (≈)": sketch.distinct(),
+                    "top": top_counts.index[0] if len(top_counts) else None,
+                    "freq (≥)": int(top_counts.iloc[0]) if len(top_counts) else 0,
+                })
+                high_cardinality = is_high_cardinality(sketch.distinct(), sketch.count)
+                st.caption(f"Frecuencias con un error máximo de {sketch.error():,} filas.")
+            else:
+                top_counts = profile["top_values"][selected_cat_col]
+                stats = profile["categorical"].loc[selected_cat_col]
+                high_cardinality = selected_cat_col in profile["high_cardinality"]
+
+            st.markdown("#### Estadísticas")
+            st.write(stats)
+            if high_cardinality:
+                st.warning("⚠️ Alta cardinalidad: casi cada fila tiene un valor distinto (¿identificador?). Se excluye de los agrupadores de color.")
+
+        with col_display:
+            # Graficos lado a lado
+            c1, c2 = st.columns(2)
+            with c1:
+                # Bar Chart
+                # Top 20 values, precomputed by the profile (or the file sketch) for readability
+                counts = top_counts.reset_index()
+                counts.columns = ['Valor', 'Frecuencia']
+
+                fig_bar = px.bar(
+                    counts, x='Valor', y='Frecuencia', 
+                    color='Frecuencia',
+                    title=f"Top Distribución: {selected_cat_col} (Max 20)",
+                    color_continuous_scale=px.colors.sequential.Bluered
+                )
+                fig_bar.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                show_chart(fig_bar)
+
+            with c2:
+                # Pie Chart
+                fig_pie = px.pie(
+                    counts, names='Valor', values='Frecuencia',
+                    title=f"Proporción: {selected_cat_col}",
+                    hole=0.4,
+                    color_discrete_sequence=px.colors.sequential.Bluered_r
+                )
+                fig_pie.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                show_chart(fig_pie)
+    else:
+        st.info("No se encontraron columnas categóricas (texto/categorías) en este dataset.")
+
+@st.fragment
+def render_numeric_tab(df, profile, view_key):
+    st.markdown("### 📈 Análisis de Variables Numéricas")
+    num_cols = profile["numeric_columns"]
+
+    if num_cols:
+        col_sel_num, col_display_num = st.columns([1, 3])
+        with col_sel_num:
+            selected_num_col = st.selectbox("Selecciona variable numérica:", num_cols)
+
+            st.markdown("#### Estadísticas Descriptivas")
+            desc = profile["numeric"].loc[selected_num_col]
+            st.dataframe(desc, use_container_width=True)
+
+        with col_display_num:
+            # Charts are built from fixed-size server-side summaries
+            summary = get_numeric_summary(df, view_key, selected_num_col)
+            if summary is None:
+                st.warning("La columna seleccionada no tiene valores numéricos válidos.")
+            else:
+                c1, c2 = st.columns(2)
+                with c1:
+                    # Histogram
+                    edges = summary["edges"]
+                    fig_hist = go.Figure(go.Bar(
+                        x=(edges[:-1] + edges[1:]) / 2,
+                        y=summary["counts"],
+                        width=np.diff(edges),
+                        marker_color='#4facfe',
+                        hovertemplate="%{x}<br>Frecuencia: %{y}<extra></extra>"
+                    ))
+                    fig_hist.update_layout(
+                        title=f"Histograma: {selected_num_col}",
+                        xaxis_title=selected_num_col, yaxis_title="count", bargap=0
+                    )
+                    fig_hist.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                    show_chart(fig_hist)
+
+                with c2:
+                    # Box Plot
+                    fig_box = go.Figure(go.Box(
+                        x=[selected_num_col],
+                        q1=[summary["q1"]], median=[summary["median"]], q3=[summary["q3"]],
+                        lowerfence=[summary["lower_whisker"]], upperfence=[summary["upper_whisker"]],
+                        mean=[summary["mean"]],
+                        marker_color='#00f2fe', name=selected_num_col
+                    ))
+                    if len(summary["outliers"]):
+                        fig_box.add_trace(go.Scatter(
+                            x=[selected_num_col] * len(summary["outliers"]), y=summary["outliers"],
+                            mode="markers", marker_color='#00f2fe', name="Atípicos"
+                        ))
+                    fig_box.update_layout(title=f"Box Plot (Valores Atípicos): {selected_num_col}", showlegend=False)
+                    if summary["n_outliers"] > len(summary["outliers"]):
+                        st.caption(f"Se muestran los {len(summary['outliers'])} atípicos más extremos de {summary['n_outliers']:,}.")
+                    if summary["n_nonfinite"]:
+                        st.caption(f"♾️ {summary['n_nonfinite']:,} valores infinitos excluidos del histograma y del box plot.")
+                    fig_box.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                    show_chart(fig_box)
+    else:
+        st.info("No se encontraron columnas numéricas en este dataset.")
+
+def render_relations_tab(df, profile, view_key, point_budget, file_source, report):
+    st.markdown("### 🔗 Relaciones y Correlaciones")
+    num_cols = profile["numeric_columns"]
+
+    if len(num_cols) > 1:
+        render_correlation_heatmap(df, num_cols, view_key, file_source, report)
+        render_scatter(df, profile, point_budget)
+    else:
+        st.info("Se necesitan al menos 2 columnas numéricas para analizar correlaciones.")
+
+@st.fragment
+def render_correlation_heatmap(df, num_cols, view_key, file_source, report):
+    # file_source = (uploaded_file, data_key, separator, encoding) in streaming mode, else None
+    # report = precomputed batch report of the whole, unfiltered file, else None
+
+    # Heatmap
+    st.subheader("Mapa de Calor (Correlación)")
+    c_method, c_view, c_thr = st.columns(3)
+    with c_method:
+        corr_method = st.radio("Método:", ["Pearson", "Spearman"], horizontal=True)
+    with c_view:
+        corr_view = st.radio("Vista:", ["Agrupada", "Filtrada"], horizontal=True,
+                             help="Agrupada ordena las variables por similitud; Filtrada muestra solo las que tienen alguna correlación fuerte.")
+    with c_thr:
+        corr_threshold = st.slider("Umbral |r| (vista filtrada):", 0.0, 1.0, 0.5, 0.05)
+
+    use_full_file = False
+    if file_source is not None and corr_method == "Pearson":
+        use_full_file = st.checkbox("Calcular sobre el archivo completo (escaneo por bloques)")
+    precomputed = report is not None and corr_method == "Pearson" and report["correlation"] is not None
+    with get_recorder().stage("Matriz de correlación"):
+        if precomputed:
+            corr = report["correlation"]
+        elif use_full_file:
+            with st.spinner("Acumulando co-momentos por bloques..."):
+                corr = get_file_correlation(*file_source, num_cols)
+        else:
+            corr = get_correlation(df, view_key, num_cols, corr_method.lower())
+
+    if corr_view == "Filtrada":
+        heat_cols = strongest_columns(corr, corr_threshold)
+    else:
+        heat_cols = cluster_order(corr)
+    if len(heat_cols) > 1:
+        fig_corr = px.imshow(
+            corr.loc[heat_cols, heat_cols], text_auto=".2f" if len(heat_cols) <= MAX_ANNOTATED_COLUMNS else False,
+            aspect="auto", zmin=-1, zmax=1,
+            color_continuous_scale='RdBu_r',
+            title=f"Matriz de Correlación ({corr_method})"
+        )
+        fig_corr.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        show_chart(fig_corr)
+    else:
+        st.info(f"Ninguna pareja de variables supera |r| ≥ {corr_threshold:.2f}.")
+
+    st.markdown("#### 🏆 Parejas más correlacionadas")
+    st.dataframe(report["top_pairs"] if precomputed else top_pairs(corr, 20), use_container_width=True)
+
+@st.fragment
+def render_scatter(df, profile, point_budget):
+    num_cols = profile["numeric_columns"]
+
+    # Scatter Plot Interactivo
+    st.subheader("Gráfico de Dispersión (Scatter Plot)")
+    c1, c2, c3 = st.columns(3)
+    with c1: x_axis = st.selectbox("Eje X", num_cols, index=0)
+    with c2: y_axis = st.selectbox("Eje Y", num_cols, index=1 if len(num_cols)>1 else 0)
+    with c3: 
+        # Identifier-like columns would create one trace per row
+        cat_cols_scatter = [c for c in profile["categorical_columns"] if c not in profile["high_cardinality"]]
+        color_col = st.selectbox("Color (Agrupador)", [None] + cat_cols_scatter)
+
+    if profile["high_cardinality"]:
+        st.caption(f"Columnas de alta cardinalidad excluidas del color: {', '.join(profile['high_cardinality'])}.")
+    if color_col is not None and profile["overview"].loc[color_col, "distinct"] > MAX_COLOR_GROUPS:
+        # Color only the most frequent groups; everything else becomes "Otros"
+        keep = profile["top_values"][color_col].index[:MAX_COLOR_GROUPS]
+        df = df.assign(**{color_col: bucket_top(df[color_col], keep)})
+        st.caption(f"🎨 Se colorean los {MAX_COLOR_GROUPS} valores más frecuentes de `{color_col}`; el resto se agrupa en \"Otros\".")
+
+    if len(df) > point_budget:
+        # Too many points for the browser: aggregate into 2D density bins
+        scatter_data = bin_scatter(df, x_axis, y_axis, color_col, bins=int(np.sqrt(point_budget)))
+        fig_scatter = px.scatter(
+            scatter_data, x=x_axis, y=y_axis, color=color_col, size="Conteo",
+            title=f"Correlación: {x_axis} vs {y_axis} (densidad)",
+            color_discrete_sequence=px.colors.qualitative.Bold,
+            render_mode="webgl"
+        )
+        st.caption(f"⚡ {len(df):,} puntos agregados en {len(scatter_data):,} celdas de densidad (WebGL).")
+    else:
+        fig_scatter = px.scatter(
+            df, x=x_axis, y=y_axis, color=color_col,
+            title=f"Correlación: {x_axis} vs {y_axis}",
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+    fig_scatter.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+    show_chart(fig_scatter)
+
+@st.fragment
+def render_time_tab(df, profile, view_key, point_budget, decimation):
+    st.markdown("### 📅 Análisis Temporal")
+
+    # Intentar detectar columnas de fecha
+    possible_date_cols = df.select_dtypes(include=['datetime']).columns.tolist()
+    possible_date_cols += [col for col in df.columns if 'date' in col.lower() or 'fecha' in col.lower() or 'time' in col.lower() or 'año' in col.lower() or 'hora' in col.lower()]
+    all_cols = df.columns.tolist()
+
+    c_sel_date, c_display_time = st.columns([1, 3])
+
+    with c_sel_date:
+        date_col = st.selectbox(
+            "Selecciona Columna de Fecha/Tiempo:", 
+            options=all_cols, 
+            index=all_cols.index(possible_date_cols[0]) if possible_date_cols else 0
+        )
+        st.info("Intenta seleccionar una columna que contenga fechas (YYYY-MM-DD), horas (HH:MM) o años.")
+
+    with c_display_time:
+        try:
+            num_cols_time = [c for c in profile["numeric_columns"] if c != date_col]
+            with get_recorder().stage("Parseo de fechas y agregación"):
+                time_index = get_time_index(df, view_key, date_col, tuple(num_cols_time))
+
+            if time_index is not None:
+                df_time = time_index["frame"]
+                if time_index["time_only"]:
+                    st.write(f"Rango horario detectado: **{df_time[date_col].iloc[0].time()}** a **{df_time[date_col].iloc[-1].time()}**")
+                else:
+                    st.write(f"Rango de Fechas detectado: **{df_time[date_col].iloc[0].date()}** a **{df_time[date_col].iloc[-1].date()}**")
+                st.caption(f"Formato detectado: `{time_index['format']}`" + (f" | {time_index['invalid']:,} valores no válidos omitidos" if time_index["invalid"] else ""))
+
+                # Time Series Plot
+                if num_cols_time:
+                    y_col_time = st.selectbox("Variable a graficar en el tiempo:", num_cols_time)
+
+                    # Aggregation: every level is precomputed in the rollup pyramid
+                    granularity_labels = {"Sin Agrupar": None, "Hora": "hour", "Día": "day", "Semana": "week", "Mes": "month", "Año": "year"}
+                    available = [label for label, level in granularity_labels.items() if level is None or level in time_index["pyramid"]]
+                    granularity = st.radio("Granularidad:", available, horizontal=True)
+                    stat_labels = {"Promedio": "mean", "Suma": "sum", "Conteo": "count", "Mínimo": "min", "Máximo": "max"}
+                    agg_type = st.radio("Agregación:", list(stat_labels), horizontal=True, disabled=granularity == "Sin Agrupar")
+
+                    if granularity == "Sin Agrupar":
+                        df_plot = df_time[[date_col, y_col_time]]
+                        y_plot = y_col_time
+                    else:
+                        level = time_index["pyramid"][granularity_labels[granularity]]
+                        y_plot = f"{agg_type} {y_col_time}"
+                        df_plot = level[(y_col_time, stat_labels[agg_type])].rename(y_plot).rename_axis(date_col).reset_index()
+
+                    df_plot, dropped = reduce_series(
+                        df_plot, date_col, y_plot, point_budget,
+                        method="lttb" if decimation == "LTTB" else "minmax"
+                    )
+                    fig_line = px.line(
+                        df_plot, x=date_col, y=y_plot,
+                        title=f"Evolución de {y_col_time}",
+                        markers=not dropped,
+                        render_mode="webgl" if dropped else "auto"
+                    )
+                    if dropped:
+                        st.caption(f"⚡ Se omitieron {dropped:,} puntos ({decimation}); se muestran {len(df_plot):,} con WebGL.")
+                    fig_line.update_traces(line_color='#00f2fe', line_width=2)
+                    fig_line.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                    show_chart(fig_line)
+                else:
+                    st.warning("No hay columnas numéricas para graficar en el tiempo.")
+            else:
+                st.warning("No se pudieron convertir los datos de esa columna ver fechas válidas.")
+        except Exception as e:
+            st.error(f"Error al procesar fechas: {e}")
+
+# Seconds between refreshes of a response that is still streaming
+AI_POLL_SECONDS = 0.5
+
+def render_ai_response(job):
+    st.markdown("### 📝 Resultados del Análisis")
+    if job.error is not None:
+        st.error(f"Error al conectar con la IA: {job.error}")
+    else:
+        st.markdown(job.text)
+
+@st.fragment(run_every=AI_POLL_SECONDS)
+def render_ai_progress(job_key):
+    # Only this block reruns while tokens arrive; the other tabs stay interactive
+    job = get_response_cache().get(job_key)
+    if job is None or job.done:
+        st.rerun()
+    render_ai_response(job)
+    st.caption("⏳ Recibiendo respuesta...")
+
+@st.fragment
+def render_ai_tab(df, profile):
+    st.markdown("### 🤖 Asistente de IA (Powered by Groq)")
+    st.markdown("""
+    <div style='background-color: rgba(0, 255, 127, 0.1); padding: 10px; border-radius: 5px; border-left: 3px solid #00ff7f;'>
+        <small>Este asistente utiliza el modelo <b>llama-3.3-70b-versatile</b> para analizar tus datos en tiempo real.</small>
+    </div>
+    """, unsafe_allow_html=True)
+
+    with st.expander("⚙️ Servidor de IA"):
+        base_url = st.text_input(
+            "URL base (compatible con OpenAI):", value=os.environ.get("AI_BASE_URL", DEFAULT_BASE_URL), key="ai_base_url",
+            help="Cambia la URL para usar un servidor local compatible con la API de OpenAI."
+        )
+        model = st.text_input("Modelo:", value=os.environ.get("AI_MODEL", DEFAULT_MODEL), key="ai_model")
+    local_server = base_url != DEFAULT_BASE_URL
+
+    api_key = st.text_input("Ingresa tu API Key de Groq:", type="password", help="Obtén tu key en https://console.groq.com/keys")
+
+    if api_key or local_server:
+        # Only a compact, token-budgeted summary of the profile is sent, never the rows
+        summary = build_summary(profile)
+        prompt = ANALYSIS_PROMPT.format(summary=summary)
+        job_key = request_key(base_url, model, api_key, SYSTEM_PROMPT, prompt)
+        cache = get_response_cache()
+        job = cache.get(job_key)
+
+        if job is None:
+            st.info("API Key detectada. Listo para analizar.")
+        elif job.done and job.error is None:
+            st.caption("♻️ Respuesta reutilizada de la caché (mismo resumen y prompt).")
+        with st.expander("📄 Resumen enviado a la IA"):
+            st.caption(f"≈ {estimate_tokens(summary):,} tokens (máximo {SUMMARY_TOKEN_BUDGET:,})")
+            st.code(summary, language=None)
+
+        if st.button("🧠 Generar Análisis Automático"):
+            client = get_ai_client(base_url, api_key or "local")
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ]
+            job = cache.submit(job_key, lambda: AnalysisJob(
+                client, model, messages, temperature=0.5, max_tokens=1024, top_p=1
+            ))
+
+        if job is not None:
+            if job.done:
+                render_ai_response(job)
+            else:
+                render_ai_progress(job_key)
+    else:
+        st.warning("⚠️ Necesitas una API Key de Groq para usar esta funcionalidad.")
+
 # Sidebar
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/2920/2920326.png", width=80)
@@ -34,6 +675,10 @@ with st.sidebar:
     st.markdown("### ⚙️ 2. Configuración CSV")
     separator = st.selectbox("Separador", [",", ";", "|", "\\t"], index=0)
     encoding_opt = st.selectbox("Codificación", ["utf-8", "latin-1", "ISO-8859-1", "cp1252"], index=0)
+    optimize_types = st.checkbox(
+        "🗜️ Optimizar tipos de datos", value=True,
+        help="Detecta booleanos, fechas y categorías y reduce el tamaño de los números para usar menos memoria."
+    )
 
     st.markdown("---")
     st.caption("Sistema de Análisis Universal con Streamlit")
@@ -41,31 +686,181 @@ with st.sidebar:
 # Main Logic
 if uploaded_file is not None:
     try:
-        # Read the file with user settings
-        df_original = pd.read_csv(uploaded_file, sep=separator, encoding=encoding_opt)
-        total_rows = len(df_original)
-        
-        # --- SAMPLE SIZE SLIDER ---
+        # Per-rerun instrumentation (the toggle lives in the Herramientas section)
+        recorder = get_recorder()
+        recorder.set_enabled(st.session_state.get("perf_panel", False))
+        recorder.begin_run(archivo=uploaded_file.name)
+
+        with recorder.stage("Hash del archivo"):
+            data_key = upload_key(uploaded_file, separator, encoding_opt)
+
+        # --- SAMPLING ---
         st.sidebar.markdown("### ✂️ 3. Muestreo")
-        sample_size = st.sidebar.slider(
-            "Cantidad de filas a analizar:",
-            min_value=min(10, total_rows),
-            max_value=total_rows,
-            value=total_rows,
-            step=1,
-            help="Desliza para analizar solo un subconjunto de datos (útil para archivos grandes)."
+        read_mode = st.sidebar.radio(
+            "Modo de lectura:",
+            ["Completo (en memoria)", "Streaming por bloques"],
+            help="El modo streaming recorre el archivo por bloques y solo conserva la muestra en memoria (para archivos más grandes que la RAM)."
         )
-        
-        # Slice the dataframe
-        df = df_original.head(sample_size)
-        
-        st.sidebar.markdown("### 🛠️ 4. Herramientas")
+        sampling_labels = {"Primeras filas": "head", "Aleatorio uniforme": "uniform", "Estratificado por categoría": "stratified"}
+        sampling_method = sampling_labels[st.sidebar.selectbox("Método de muestreo:", list(sampling_labels))]
+        strata_col = None
+        if sampling_method == "stratified":
+            uploaded_file.seek(0)
+            strata_col = st.sidebar.selectbox("Columna de estratificación:", read_header(uploaded_file, separator, encoding_opt))
+
+        if read_mode == "Streaming por bloques":
+            sample_size = st.sidebar.number_input(
+                "Tamaño de la muestra:",
+                min_value=10,
+                value=DEFAULT_STREAM_SAMPLE,
+                step=1000,
+                help="Filas que se conservan durante el escaneo del archivo."
+            )
+            with st.spinner("Escaneando el archivo por bloques..."), recorder.stage("Lectura por bloques"):
+                try:
+                    df, total_rows = load_stream_sample(uploaded_file, data_key, separator, encoding_opt, int(sample_size), sampling_method, strata_col)
+                except TooManyStrata as e:
+                    # Identifier-like stratum column: fall back to a uniform sample
+                    st.sidebar.warning(f"⚠️ {e} Se usa muestreo aleatorio uniforme.")
+                    sampling_method, strata_col = "uniform", None
+                    df, total_rows = load_stream_sample(uploaded_file, data_key, separator, encoding_opt, int(sample_size), sampling_method, strata_col)
+            type_report = None
+            if optimize_types:
+                with recorder.stage("Optimización de tipos"):
+                    df, type_report = get_compacted(df, f"{data_key}|{sample_size}|{sampling_method}|{strata_col}")
+            st.sidebar.caption(f"Filas encontradas en el escaneo: **{total_rows:,}**")
+        else:
+            # Read the file with user settings (parsed once per content hash)
+            ingestion_cache = get_ingestion_cache()
+            # With "Optimizar tipos" the cache compacts once and keeps only the compact copy
+            with recorder.stage("Lectura CSV"):
+                df_original, type_report, source = ingestion_cache.get(data_key, optimize_types)
+                if df_original is None:
+                    df_original, type_report, data_key, source = ingestion_cache.load(
+                        uploaded_file.getvalue(), separator, encoding_opt, key=data_key, optimize_types=optimize_types
+                    )
+            total_rows = len(df_original)
+
+            sample_size = st.sidebar.slider(
+                "Cantidad de filas a analizar:",
+                min_value=min(10, total_rows),
+                max_value=total_rows,
+                value=total_rows,
+                step=1,
+                help="Desliza para analizar solo un subconjunto de datos (útil para archivos grandes)."
+            )
+
+            # Slice the dataframe
+            with recorder.stage("Muestreo"):
+                try:
+                    df = sample_frame(df_original, sample_size, sampling_method, strata_col)
+                except TooManyStrata as e:
+                    st.sidebar.warning(f"⚠️ {e} Se usa muestreo aleatorio uniforme.")
+                    sampling_method, strata_col = "uniform", None
+                    df = sample_frame(df_original, sample_size, sampling_method, strata_col)
+
+            with st.sidebar.expander("🗄️ Caché de Ingesta"):
+                source_labels = {"memory": "memoria", "disk": "archivo Arrow", "parsed": "CSV (lectura completa)"}
+                st.caption(f"Origen de los datos: **{source_labels[source]}**")
+                cache_stats = ingestion_cache.stats
+                c_hit, c_disk = st.columns(2)
+                c_hit.metric("Hits RAM", cache_stats["memory_hits"])
+                c_disk.metric("Hits Disco", cache_stats["disk_hits"])
+                c_miss, c_evict = st.columns(2)
+                c_miss.metric("Fallos", cache_stats["misses"])
+                c_evict.metric("Desalojos", cache_stats["evictions"])
+                st.caption(f"{len(ingestion_cache)}/{ingestion_cache.max_entries} datasets en memoria "
+                           f"({ingestion_cache.memory_usage() / 2 ** 20:,.1f} MB)")
+
+        # Duplicate handling: the widgets are always rendered (not inside a lazy
+        # tab), otherwise Streamlit drops their state while another tab is open
+        fingerprints = get_fingerprint_index(data_key, read_mode)
+        with st.sidebar.expander("🧬 Duplicados"):
+            st.multiselect(
+                "Columnas clave (vacío = fila completa):",
+                df.columns.tolist(),
+                key="dup_keys",
+                help="Por ejemplo ID_Finca o ID_Sensor para encontrar registros repetidos por identificador."
+            )
+            drop_dups = st.toggle("🧹 Eliminar duplicados en todo el análisis", key="drop_duplicates")
+        dup_keys = [c for c in st.session_state.get("dup_keys", []) if c in df.columns]
+        if drop_dups:
+            with recorder.stage("Eliminación de duplicados"):
+                df = fingerprints.drop_duplicates(df, dup_keys)
+
+        view_key = f"{data_key}|{read_mode}|{sample_size}|{sampling_method}|{strata_col}|{optimize_types}|{drop_dups}|{dup_keys}"
+
+        # --- GLOBAL FILTERS ---
+        st.sidebar.markdown("### 🔎 4. Filtros Globales")
+        filter_index = get_filter_index(df, view_key)
+        filter_cols = st.sidebar.multiselect(
+            "Columnas a filtrar:", df.columns.tolist(), key="filter_cols",
+            help="Los filtros se aplican a todas las pestañas y al asistente de IA."
+        )
+        predicates = {}
+        for col in filter_cols:
+            if col not in df.columns:
+                continue
+            col_index = filter_index.index(col)
+            if col_index is None:
+                st.sidebar.caption(f"`{col}` tiene demasiados valores distintos para filtrar por valor.")
+            elif isinstance(col_index, SortedIndex):
+                low, high = col_index.bounds()
+                if low is None or low == high:
+                    continue
+                if pd.api.types.is_datetime64_any_dtype(df[col]):
+                    low, high = pd.Timestamp(low).date(), pd.Timestamp(high).date()
+                    dates = st.sidebar.date_input(col, (low, high), min_value=low, max_value=high, key=f"filter_{col}")
+                    if len(dates) == 2 and tuple(dates) != (low, high):
+                        predicates[col] = ("range", (pd.Timestamp(dates[0]), pd.Timestamp(dates[1]) + pd.Timedelta(days=1) - pd.Timedelta(1)))
+                else:
+                    chosen = st.sidebar.slider(col, float(low), float(high), (float(low), float(high)), key=f"filter_{col}")
+                    if chosen != (float(low), float(high)):
+                        predicates[col] = ("range", chosen)
+            else:
+                chosen = st.sidebar.multiselect(col, list(col_index.values), key=f"filter_{col}")
+                if chosen:
+                    predicates[col] = ("in", chosen)
+
+        if predicates:
+            view_key += f"|{sorted((col, kind, repr(arg)) for col, (kind, arg) in predicates.items())}"
+            with recorder.stage("Filtros globales"):
+                df = df.take(get_filter_positions(filter_index, view_key, predicates))
+
+        # Every tab reads its statistics from this single profile; for a whole,
+        # unfiltered file it can come from a report written by batch_profile.py
+        report = None
+        if read_mode == "Completo (en memoria)" and sample_size == total_rows and not drop_dups and not predicates:
+            report = get_precomputed_report(data_key, optimize_types, report_index_mtime())
+        if report is not None:
+            profile = report["profile"]
+            st.sidebar.caption(f"📑 Estadísticas del reporte precomputado ({report['generated_at']}).")
+        else:
+            with recorder.stage("Perfil del dataset"):
+                profile = get_profile(df, view_key)
+        recorder.annotate(filas=len(df), columnas=df.shape[1], modo=read_mode, muestra=sample_size, filtros=len(predicates))
+
+        st.sidebar.markdown("### 🛠️ 5. Herramientas")
         show_gen = st.sidebar.checkbox("📋 Vista General", value=True)
         show_cat = st.sidebar.checkbox("📊 Análisis Cualitativo", value=True)
         show_num = st.sidebar.checkbox("📈 Análisis Cuantitativo", value=True)
         show_rel = st.sidebar.checkbox("🔗 Relaciones", value=True)
         show_time = st.sidebar.checkbox("📅 Series de Tiempo", value=True)
         show_ai = st.sidebar.checkbox("🤖 Asistente IA", value=True)
+
+        with st.sidebar.expander("⚡ Rendimiento de Gráficos"):
+            point_budget = st.number_input(
+                "Máximo de puntos por gráfico:",
+                min_value=1000,
+                value=MAX_PLOT_POINTS,
+                step=1000,
+                help="Por encima de este límite los datos se reducen en el servidor y se dibujan con WebGL."
+            )
+            decimation = st.radio("Reducción de series de tiempo:", ["LTTB", "Mín/Máx por bloque"], horizontal=True)
+        st.sidebar.toggle(
+            "🐞 Panel de rendimiento", key="perf_panel",
+            help="Mide tiempo, memoria pico y tamaño de cada etapa y gráfico en cada ejecución (medir la memoria ralentiza un poco la app)."
+        )
         
         # --- HEADER ---
         st.title("📊 Dashboard de Análisis Exploratorio")
@@ -74,6 +869,8 @@ if uploaded_file is not None:
         info_text = f"Analizando: <b>{uploaded_file.name}</b> | Registros: <b>{len(df)}</b>/{total_rows}"
         if len(df) < total_rows:
             info_text += f" (Muestra del {int((len(df)/total_rows)*100)}%)"
+        if predicates:
+            info_text += f" | Filtros activos: <b>{len(predicates)}</b>"
             
         st.markdown(f"""
         <div style='background-color: rgba(79, 172, 254, 0.1); padding: 1rem; border-radius: 10px; border-left: 5px solid #4facfe; margin-bottom: 2rem;'>
@@ -93,313 +890,53 @@ if uploaded_file is not None:
         if show_ai: tabs_config.append({"title": "🤖 Asistente IA", "key": "ai"})
         
         if not tabs_config:
-            st.warning("⚠️ Por favor selecciona al menos una herramienta en el panel lateral (Sección 4).")
+            st.warning("⚠️ Por favor selecciona al menos una herramienta en el panel lateral (Sección 5).")
         else:
-            # Create Tabs
-            tabs_objects = st.tabs([t["title"] for t in tabs_config])
+            # Create Tabs (they track the active tab so hidden ones are skipped)
+            tabs_objects = st.tabs([t["title"] for t in tabs_config], key="active_tab", on_change="rerun")
             
             # Map Key -> Tab Object
             tabs_dict = {config["key"]: tab for config, tab in zip(tabs_config, tabs_objects)}
-            
-            # === TAB 1: GENERAL ===
-            if "gen" in tabs_dict:
-                with tabs_dict["gen"]:
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1: st.metric("Filas", df.shape[0])
-                    with col2: st.metric("Columnas", df.shape[1])
-                    with col3: st.metric("Duplicados", df.duplicated().sum())
-                    with col4: st.metric("Celdas Vacías", df.isnull().sum().sum())
-
-                    st.markdown("### 🔍 Vista Previa")
-                    
-                    # Slider for preview rows
-                    rows_to_show = st.slider(
-                        "Filas a visualizar en la tabla:", 
-                        min_value=5, 
-                        max_value=len(df), 
-                        value=10, 
-                        step=5,
-                        key="slider_preview_rows"
-                    )
-                    
-                    st.dataframe(df.head(rows_to_show), use_container_width=True)
-                    
-                    # Missing Values Chart
-                    st.subheader("⚠️ Mapa de Valores Nulos")
-                    nulls = df.isnull().sum()
-                    if nulls.sum() > 0:
-                        fig_null = px.bar(
-                            x=nulls.index, 
-                            y=nulls.values,
-                            labels={'x': 'Columna', 'y': 'Cantidad de Nulos'},
-                            title="Valores Nulos por Columna",
-                            color_discrete_sequence=['#ff6b6b']
-                        )
-                        fig_null.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                        st.plotly_chart(fig_null, use_container_width=True)
-                    else:
-                        st.success("¡Excelente! No se detectaron valores nulos en el dataset.")
-
-            # === TAB 2: CUALITATIVO (CATEGÓRICO) ===
-            if "cat" in tabs_dict:
-                with tabs_dict["cat"]:
-                    st.markdown("### 📊 Análisis de Variables Categóricas")
-                    cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-                    
-                    if cat_cols:
-                        col_sel, col_display = st.columns([1, 3])
-                        with col_sel:
-                            selected_cat_col = st.selectbox("Selecciona una columna (Categoría):", cat_cols)
-                            
-                            st.markdown("#### Estadísticas")
-                            st.write(df[selected_cat_col].describe())
-                        
-                        with col_display:
-                            # Graficos lado a lado
-                            c1, c2 = st.columns(2)
-                            with c1:
-                                # Bar Chart
-                                counts = df[selected_cat_col].value_counts().reset_index()
-                                counts.columns = ['Valor', 'Frecuencia']
-                                # Limit to top 20 for readability
-                                counts = counts.head(20)
-                                
-                                fig_bar = px.bar(
-                                    counts, x='Valor', y='Frecuencia', 
-                                    color='Frecuencia',
-                                    title=f"Top Distribución: {selected_cat_col} (Max 20)",
-                                    color_continuous_scale=px.colors.sequential.Bluered
-                                )
-                                fig_bar.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                                st.plotly_chart(fig_bar, use_container_width=True)
-                            
-                            with c2:
-                                # Pie Chart
-                                fig_pie = px.pie(
-                                    counts, names='Valor', values='Frecuencia',
-                                    title=f"Proporción: {selected_cat_col}",
-                                    hole=0.4,
-                                    color_discrete_sequence=px.colors.sequential.Bluered_r
-                                )
-                                fig_pie.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                                st.plotly_chart(fig_pie, use_container_width=True)
-                    else:
-                        st.info("No se encontraron columnas categóricas (texto/categorías) en este dataset.")
-
-            # === TAB 3: CUANTITATIVO (NUMÉRICO) ===
-            if "num" in tabs_dict:
-                with tabs_dict["num"]:
-                    st.markdown("### 📈 Análisis de Variables Numéricas")
-                    num_cols = df.select_dtypes(include=['number']).columns.tolist()
-                    
-                    if num_cols:
-                        col_sel_num, col_display_num = st.columns([1, 3])
-                        with col_sel_num:
-                            selected_num_col = st.selectbox("Selecciona variable numérica:", num_cols)
-                            
-                            st.markdown("#### Estadísticas Descriptivas")
-                            desc = df[selected_num_col].describe()
-                            st.dataframe(desc, use_container_width=True)
-                        
-                        with col_display_num:
-                            c1, c2 = st.columns(2)
-                            with c1:
-                                # Histogram
-                                fig_hist = px.histogram(
-                                    df, x=selected_num_col, 
-                                    nbins=30, 
-                                    title=f"Histograma: {selected_num_col}",
-                                    color_discrete_sequence=['#4facfe']
-                                )
-                                fig_hist.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                                st.plotly_chart(fig_hist, use_container_width=True)
-                            
-                            with c2:
-                                # Box Plot
-                                fig_box = px.box(
-                                    df, y=selected_num_col,
-                                    title=f"Box Plot (Valores Atípicos): {selected_num_col}",
-                                    color_discrete_sequence=['#00f2fe']
-                                )
-                                fig_box.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                                st.plotly_chart(fig_box, use_container_width=True)
-                    else:
-                        st.info("No se encontraron columnas numéricas en este dataset.")
-
-            # === TAB 4: RELACIONES ===
-            if "rel" in tabs_dict:
-                with tabs_dict["rel"]:
-                    st.markdown("### 🔗 Relaciones y Correlaciones")
-                    num_cols = df.select_dtypes(include=['number']).columns.tolist()
-                    
-                    if len(num_cols) > 1:
-                        # Heatmap
-                        st.subheader("Mapa de Calor (Correlación)")
-                        corr = df[num_cols].corr()
-                        fig_corr = px.imshow(
-                            corr, text_auto=True, aspect="auto",
-                            color_continuous_scale='RdBu_r',
-                            title="Matriz de Correlación"
-                        )
-                        fig_corr.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                        st.plotly_chart(fig_corr, use_container_width=True)
-                        
-                        # Scatter Plot Interactivo
-                        st.subheader("Gráfico de Dispersión (Scatter Plot)")
-                        c1, c2, c3 = st.columns(3)
-                        with c1: x_axis = st.selectbox("Eje X", num_cols, index=0)
-                        with c2: y_axis = st.selectbox("Eje Y", num_cols, index=1 if len(num_cols)>1 else 0)
-                        with c3: 
-                            cat_cols_scatter = df.select_dtypes(include=['object', 'category']).columns.tolist()
-                            color_col = st.selectbox("Color (Agrupador)", [None] + cat_cols_scatter)
-
-                        fig_scatter = px.scatter(
-                            df, x=x_axis, y=y_axis, color=color_col,
-                            title=f"Correlación: {x_axis} vs {y_axis}",
-                            color_discrete_sequence=px.colors.qualitative.Bold
-                        )
-                        fig_scatter.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                        st.plotly_chart(fig_scatter, use_container_width=True)
-                    else:
-                        st.info("Se necesitan al menos 2 columnas numéricas para analizar correlaciones.")
-            
-            # === TAB 5: SERIES DE TIEMPO ===
-            if "time" in tabs_dict:
-                with tabs_dict["time"]:
-                    st.markdown("### 📅 Análisis Temporal")
-                    
-                    # Intentar detectar columnas de fecha
-                    possible_date_cols = [col for col in df.columns if 'date' in col.lower() or 'fecha' in col.lower() or 'time' in col.lower() or 'año' in col.lower()]
-                    all_cols = df.columns.tolist()
-                    
-                    c_sel_date, c_display_time = st.columns([1, 3])
-                    
-                    with c_sel_date:
-                        date_col = st.selectbox(
-                            "Selecciona Columna de Fecha/Tiempo:", 
-                            options=all_cols, 
-                            index=all_cols.index(possible_date_cols[0]) if possible_date_cols else 0
-                        )
-                        st.info("Intenta seleccionar una columna que contenga fechas (YYYY-MM-DD) o años.")
-
-                    with c_display_time:
-                        try:
-                            # Copy df to avoid affecting other tabs
-                            df_time = df.copy()
-                            df_time[date_col] = pd.to_datetime(df_time[date_col], errors='coerce')
-                            
-                            # Drop invalid dates
-                            df_time = df_time.dropna(subset=[date_col])
-                            
-                            if not df_time.empty:
-                                df_time = df_time.sort_values(by=date_col)
-                                
-                                st.write(f"Rango de Fechas detectado: **{df_time[date_col].min().date()}** a **{df_time[date_col].max().date()}**")
-                                
-                                # Time Series Plot
-                                num_cols_time = df_time.select_dtypes(include=['number']).columns.tolist()
-                                if num_cols_time:
-                                    y_col_time = st.selectbox("Variable a graficar en el tiempo:", num_cols_time)
-                                    
-                                    # Aggregation
-                                    agg_type = st.radio("Agregación:", ["Sin Agrupar", "Promedio Mensual", "Suma Mensual"], horizontal=True)
-                                    
-                                    if agg_type == "Promedio Mensual":
-                                        df_plot = df_time.set_index(date_col).resample('M')[y_col_time].mean().reset_index()
-                                    elif agg_type == "Suma Mensual":
-                                        df_plot = df_time.set_index(date_col).resample('M')[y_col_time].sum().reset_index()
-                                    else:
-                                        df_plot = df_time
-                                        
-                                    fig_line = px.line(
-                                        df_plot, x=date_col, y=y_col_time,
-                                        title=f"Evolución de {y_col_time}",
-                                        markers=True
-                                    )
-                                    fig_line.update_traces(line_color='#00f2fe', line_width=2)
-                                    fig_line.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-                                    st.plotly_chart(fig_line, use_container_width=True)
-                                else:
-                                    st.warning("No hay columnas numéricas para graficar en el tiempo.")
-                            else:
-                                st.warning("No se pudieron convertir los datos de esa columna ver fechas válidas.")
-                        except Exception as e:
-                            st.error(f"Error al procesar fechas: {e}")
-
-            # === TAB 6: ASISTENTE IA ===
-            if "ai" in tabs_dict:
-                with tabs_dict["ai"]:
-                    st.markdown("### 🤖 Asistente de IA (Powered by Groq)")
-                    st.markdown("""
-                    <div style='background-color: rgba(0, 255, 127, 0.1); padding: 10px; border-radius: 5px; border-left: 3px solid #00ff7f;'>
-                        <small>Este asistente utiliza el modelo <b>llama-3.3-70b-versatile</b> para analizar tus datos en tiempo real.</small>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    api_key = st.text_input("Ingresa tu API Key de Groq:", type="password", help="Obtén tu key en https://console.groq.com/keys")
-                    
-                    if api_key:
-                        st.info("API Key detectada. Listo para analizar.")
-                        if st.button("🧠 Generar Análisis Automático"):
-                            with st.spinner("La IA está analizando tu dataset..."):
-                                try:
-                                    # Prepare Data Context (limited to save tokens)
-                                    from openai import OpenAI
-                                    
-                                    client = OpenAI(
-                                        base_url="https://api.groq.com/openai/v1",
-                                        api_key=api_key
-                                    )
-                                    
-                                    data_summary = f"""
-                                    Dataset Info:
-                                    - Rows: {df.shape[0]}, Columns: {df.shape[1]}
-                                    - Columns: {', '.join(df.columns)}
-                                    - Missing Values: {df.isnull().sum().to_dict()}
-                                    - Sample Data (first 5 rows):
-                                    {df.head().to_markdown()}
-                                    - Statistics:
-                                    {df.describe().to_markdown()}
-                                    """
-                                    
-                                    prompt = f"""
-                                    Act as an expert Data Scientist. Analyze the following dataset summary and provide:
-                                    1. 3 Key Observations/Trends.
-                                    2. Potential anomalies or data quality issues.
-                                    3. Suggestions for 2 specific advanced visualizations.
-                                    
-                                    Dataset:
-                                    {data_summary}
-                                    
-                                    Format the output in clear Markdown with emojis. Keep it concise but professional.
-                                    """
-                                    
-                                    completion = client.chat.completions.create(
-                                        model="llama-3.3-70b-versatile",
-                                        messages=[
-                                            {"role": "system", "content": "You are a helpful Data Analysis Assistant capable of finding hidden insights in CSV data."},
-                                            {"role": "user", "content": prompt}
-                                        ],
-                                        temperature=0.5,
-                                        max_tokens=1024,
-                                        top_p=1,
-                                        stream=False,
-                                        stop=None,
-                                    )
-                                    
-                                    response = completion.choices[0].message.content
-                                    st.markdown("### 📝 Resultados del Análisis")
-                                    st.markdown(response)
-                                    
-                                except Exception as e:
-                                    st.error(f"Error al conectar con la IA: {e}")
-                    else:
-                        st.warning("⚠️ Necesitas una API Key de Groq para usar esta funcionalidad.")
+
+            # Only the selected tab runs; heavy tabs are computed when first opened
+            # and later visits read their results from the caches
+            if "gen" in tabs_dict and tabs_dict["gen"].open:
+                with tabs_dict["gen"], recorder.stage("Pestaña General"):
+                    render_general_tab(df, profile, view_key, fingerprints, dup_keys, type_report, report)
+
+            if "cat" in tabs_dict and tabs_dict["cat"].open:
+                with tabs_dict["cat"], recorder.stage("Pestaña Cualitativo"):
+                    file_source = (uploaded_file, data_key, separator, encoding_opt) if read_mode == "Streaming por bloques" else None
+                    render_categorical_tab(df, profile, file_source)
+
+            if "num" in tabs_dict and tabs_dict["num"].open:
+                with tabs_dict["num"], recorder.stage("Pestaña Cuantitativo"):
+                    render_numeric_tab(df, profile, view_key)
+
+            if "rel" in tabs_dict and tabs_dict["rel"].open:
+                with tabs_dict["rel"], recorder.stage("Pestaña Relaciones"):
+                    file_source = (uploaded_file, data_key, separator, encoding_opt) if read_mode == "Streaming por bloques" else None
+                    render_relations_tab(df, profile, view_key, point_budget, file_source, report)
+
+            if "time" in tabs_dict and tabs_dict["time"].open:
+                with tabs_dict["time"], recorder.stage("Pestaña Series de Tiempo"):
+                    render_time_tab(df, profile, view_key, point_budget, decimation)
+
+            if "ai" in tabs_dict and tabs_dict["ai"].open:
+                with tabs_dict["ai"], recorder.stage("Pestaña Asistente IA"):
+                    render_ai_tab(df, profile)
+
+        if recorder.enabled:
+            render_perf_panel(recorder)
 
     except Exception as e:
         st.error(f"❌ Error al leer el archivo: {e}")
         st.info("Prueba combiando el Separador o la Codificación en el panel lateral.")
 else:
+    # The panel toggle is not rendered without a file: stop tracing memory
+    if "_perf_recorder" in st.session_state:
+        get_recorder().set_enabled(False)
+
     # Empty State with Animation
     st.markdown("""
     <div style='text-align: center; margin-top: 50px;'>
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [10, 25, 50, 100, 500]
+
+
+def sort_positions(df, column=None, ascending=True):
+    """Row positions of ``df`` ordered by ``column`` (NaN always last)."""
+    if column is None:
+        return np.arange(len(df))
+    values = df[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def text_mask(series, text):
+    """Rows whose value contains ``text`` (case-insensitive)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match each category once and broadcast through the codes
+        hits = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, np.append(hits, False)[codes], False)
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy() & series.notna().to_numpy()
+
+
+def range_mask(series, low, high):
+    """Rows whose value lies in ``[low, high]``."""
+    return series.between(low, high).to_numpy()
+
+
+def page_positions(positions, mask, page, page_size):
+    """Positions of the rows on ``page`` (1-based) after filtering.
+
+    Returns ``(page_positions, total_matches)``.
+    """
+    if mask is not None:
+        positions = positions[mask[positions]]
+    start = (page - 1) * page_size
+    return positions[start:start + page_size], len(positions)
@@ -0,0 +1,108 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from sketches import is_high_cardinality
+
+# dtypes treated as categorical (``string`` covers pandas>=3 text columns)
+CATEGORICAL_DTYPES = ["object", "category", "string"]
+# Most frequent values kept per categorical column
+TOP_VALUES = 20
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def categorical_columns(df):
+    return df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+
+def numeric_columns(df):
+    return df.select_dtypes(include=["number"]).columns.tolist()
+
+
+def numeric_stats(df):
+    """``describe()``-like table (one row per column) plus skew and kurtosis.
+
+    All numeric columns are stacked into a single float matrix so every
+    statistic is one NumPy reduction over axis 0 instead of a per-column scan.
+    """
+    stat_names = ["count", "mean", "std", "min", "25%", "50%", "75%", "max", "skew", "kurtosis"]
+    if df.shape[1] == 0 or df.shape[0] == 0:
+        return pd.DataFrame(index=df.columns, columns=stat_names, dtype="float64")
+
+    values = df.to_numpy(dtype="float64", na_value=np.nan)
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        # All-NaN columns legitimately produce NaN statistics
+        warnings.simplefilter("ignore", RuntimeWarning)
+        count = (~np.isnan(values)).sum(axis=0)
+        mean = np.nanmean(values, axis=0)
+        centered = values - mean
+        m2 = np.nanmean(centered ** 2, axis=0)
+        m3 = np.nanmean(centered ** 3, axis=0)
+        m4 = np.nanmean(centered ** 4, axis=0)
+        std = np.sqrt(m2 * count / np.where(count > 1, count - 1, np.nan))
+        quartiles = np.nanquantile(values, QUANTILES, axis=0)
+        stats = np.vstack([
+            count,
+            mean,
+            std,
+            np.nanmin(values, axis=0),
+            quartiles,
+            np.nanmax(values, axis=0),
+            m3 / m2 ** 1.5,
+            m4 / m2 ** 2 - 3,
+        ])
+    return pd.DataFrame(stats.T, index=df.columns, columns=stat_names)
+
+
+def profile_frame(df, top_n=TOP_VALUES):
+    """Compute every statistic the dashboard shows for ``df`` in one pass.
+
+    Returns a dict with dataset totals, an ``overview`` table (dtype, nulls,
+    distinct per column), ``numeric`` and ``categorical`` describe tables,
+    the ``top_values`` counts of each categorical column and the
+    ``high_cardinality`` categorical columns (identifier-like).
+    """
+    num_cols = numeric_columns(df)
+    cat_cols = categorical_columns(df)
+
+    nulls = df.isna().sum()
+    distinct = {}
+    top_values = {}
+    categorical_rows = {}
+    for col in cat_cols:
+        counts = df[col].value_counts()
+        # Categorical dtypes also list categories absent from this view
+        counts = counts[counts > 0]
+        distinct[col] = len(counts)
+        top_values[col] = counts.head(top_n)
+        categorical_rows[col] = {
+            "count": int(len(df) - nulls[col]),
+            "unique": len(counts),
+            "top": counts.index[0] if len(counts) else None,
+            "freq": int(counts.iloc[0]) if len(counts) else 0,
+        }
+    for col in df.columns:
+        if col not in distinct:
+            distinct[col] = int(df[col].nunique())
+
+    overview = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "nulls": nulls,
+        "distinct": pd.Series(distinct),
+    }).loc[df.columns]
+
+    return {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "null_cells": int(nulls.sum()),
+        "numeric_columns": num_cols,
+        "categorical_columns": cat_cols,
+        "overview": overview,
+        "numeric": numeric_stats(df[num_cols]),
+        "categorical": pd.DataFrame.from_dict(categorical_rows, orient="index",
+                                              columns=["count", "unique", "top", "freq"]),
+        "top_values": top_values,
+        "high_cardinality": [col for col in cat_cols
+                             if is_high_cardinality(categorical_rows[col]["unique"], categorical_rows[col]["count"])],
+    }
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+# Formats tried (in order) when inferring how a column stores dates/times
+DATETIME_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d-%m-%Y",
+    "%d/%m/%Y %H:%M",
+    "%H:%M",
+    "%H:%M:%S",
+    "%Y",
+]
+TIME_ONLY_FORMATS = {"%H:%M", "%H:%M:%S"}
+# Share of sampled values a format must parse to be accepted
+MIN_PARSE_RATIO = 0.95
+# Values inspected per column when inferring the format
+FORMAT_SAMPLE_SIZE = 200
+
+# Rollup levels from finest to coarsest and the level each one is built from
+LEVELS = ["hour", "day", "week", "month", "year"]
+PARENT_LEVEL = {"day": "hour", "week": "day", "month": "day", "year": "month"}
+STATS = ["count", "sum", "mean", "min", "max"]
+
+
+def _as_text(values):
+    if pd.api.types.is_numeric_dtype(values):
+        # Whole-number years: 2021.0 must become "2021", not "2021.0"
+        return values.astype("Int64").astype(str)
+    return values.astype(str).str.strip()
+
+
+def infer_datetime_format(series, sample_size=FORMAT_SAMPLE_SIZE):
+    """Return the first known format that parses the sampled values, or None."""
+    values = series.dropna()
+    if pd.api.types.is_bool_dtype(values):
+        return None
+    if pd.api.types.is_numeric_dtype(values):
+        # Only whole numbers in a plausible range can be years
+        if values.empty or not (values % 1 == 0).all() or not values.between(1800, 2200).all():
+            return None
+    values = _as_text(values)
+    if values.empty:
+        return None
+    sample = values.sample(min(sample_size, len(values)), random_state=0)
+    for fmt in DATETIME_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+        if parsed.notna().mean() >= MIN_PARSE_RATIO:
+            return fmt
+    return None
+
+
+def bucket_keys(times, level):
+    """Start timestamp of the ``level`` bucket each timestamp falls in."""
+    times = pd.DatetimeIndex(times)
+    if level == "hour":
+        return times.floor("h")
+    if level == "day":
+        return times.floor("D")
+    if level == "week":
+        day = times.floor("D")
+        return day - pd.to_timedelta(day.dayofweek, unit="D")
+    if level == "month":
+        return times.to_period("M").to_timestamp()
+    if level == "year":
+        return times.to_period("Y").to_timestamp()
+    raise ValueError(f"Nivel desconocido: {level}")
+
+
+def _finish(level_sums):
+    """Add the mean and order the (column, stat) pairs."""
+    for col in level_sums.columns.get_level_values(0).unique():
+        level_sums[(col, "mean")] = level_sums[(col, "sum")] / level_sums[(col, "count")].replace(0, np.nan)
+    return level_sums.reindex(columns=pd.MultiIndex.from_product(
+        [level_sums.columns.get_level_values(0).unique(), STATS]))
+
+
+def build_rollups(times, values, levels=LEVELS):
+    """Rollup pyramid: per level, count/sum/mean/min/max of every column.
+
+    Only the finest level scans the rows; each coarser level is aggregated
+    from its parent's count/sum/min/max, so the whole pyramid costs about
+    one groupby over the data.
+    """
+    pyramid = {}
+    for level in levels:
+        parent = PARENT_LEVEL.get(level)
+        if parent in pyramid:
+            source = pyramid[parent].drop(columns="mean", level=1)
+            keys = bucket_keys(source.index, level)
+            grouped = source.groupby(keys)
+            stats = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+            agg = pd.concat(
+                {stat: grouped.agg({col: how for col in source.columns if col[1] == stat})
+                 .droplevel(1, axis=1) for stat, how in stats.items()},
+                axis=1,
+            ).swaplevel(0, 1, axis=1)
+        else:
+            keys = bucket_keys(times, level)
+            # Compacted float32 columns would accumulate their sums in float32
+            agg = values.astype("float64").groupby(keys).agg(["count", "sum", "min", "max"])
+        agg.index.name = "bucket"
+        pyramid[level] = _finish(agg)
+    return pyramid
+
+
+def prepare_time_index(df, date_col, numeric_cols):
+    """Parse, sort and roll up ``df`` along ``date_col`` once.
+
+    Returns a dict with the inferred ``format``, whether the column only
+    holds times of day (``time_only``, anchored to 1900-01-01), the sorted
+    ``frame`` of valid rows and the rollup ``pyramid`` (empty without
+    numeric columns); or None when the column does not hold dates.
+    """
+    raw = df[date_col]
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        # Already parsed (e.g. by the dtype compaction pass)
+        fmt, parsed = "datetime64", raw
+    else:
+        fmt = infer_datetime_format(raw)
+        if fmt is None:
+            return None
+        parsed = pd.to_datetime(_as_text(raw).where(raw.notna()), format=fmt, errors="coerce")
+    valid = parsed.notna().to_numpy()
+    if not valid.any():
+        return None
+
+    order = np.argsort(parsed[valid].to_numpy(), kind="stable")
+    times = pd.DatetimeIndex(parsed[valid].to_numpy()[order])
+    values = df.loc[valid, numeric_cols].iloc[order].set_axis(times)
+    time_only = fmt in TIME_ONLY_FORMATS
+    # A time of day has no day/week/month/year to roll up to
+    levels = ["hour"] if time_only else LEVELS
+
+    frame = values.reset_index(names=date_col)
+    return {
+        "format": fmt,
+        "time_only": time_only,
+        "invalid": int((~valid).sum()),
+        "frame": frame,
+        # Nothing to aggregate without numeric columns
+        "pyramid": build_rollups(times, values, levels) if len(numeric_cols) else {},
+    }